@@ -1,29 +1,84 @@
+import importlib
+
 import streamlit as st
-from modules.ai_support import render_ai_support
-from modules.emotional_support import render_emotional_support
-from modules.intake import render_intake_form
-from modules.voting_rights import render_voting_rights
-from modules.todo_list import render_todo_list
-from modules.form_preview import render_form_preview
-from modules.legal_info import render_legal_info
+from modules import profiler
+
+# No-op unless APP_PROFILE=1 or --profile is given
+profiler.start()
+
+# Loads .env and the shared LLM settings once per process, before any page runs
+from modules.llm_gateway import config
+from modules.conversation_memory import ConversationMemory
+
+# Sidebar label -> (page module, render function, description). A page's
+# module is only imported the first time it is selected.
+PAGES = {
+    "Intake Form": (
+        "modules.intake", "render_intake_form",
+        "Start here! Fill out basic information about your name change process."
+    ),
+    "AI Support": (
+        "modules.ai_support", "render_ai_support",
+        "Get AI-powered assistance and answers to your questions."
+    ),
+    "Emotional Support": (
+        "modules.emotional_support", "render_emotional_support",
+        "Find resources and support for your journey."
+    ),
+    "Legal Information": (
+        "modules.legal_info", "render_legal_info",
+        "Access state-specific legal requirements and procedures."
+    ),
+    "Voting Rights": (
+        "modules.voting_rights", "render_voting_rights",
+        "Learn about updating your voter registration after a name change."
+    ),
+    "Todo List": (
+        "modules.todo_list", "render_todo_list",
+        "Track your progress with a customized checklist."
+    ),
+    "Form Preview": (
+        "modules.form_preview", "render_form_preview",
+        "Preview and download your completed forms."
+    ),
+}
+
+# Operator-only page, offered only when ADMIN_PASSWORD is configured
+if config.ADMIN_PASSWORD:
+    PAGES["Performance Dashboard"] = (
+        "modules.admin_dashboard", "render_admin_dashboard",
+        "Operator view of model call latency, cache hits and token spend."
+    )
+
+def render_page(label):
+    """Import the page's module on first use and render it"""
+    module_name, function_name, _ = PAGES[label]
+    with profiler.span(f"render {label}"):
+        with profiler.span(f"import {module_name}"):
+            module = importlib.import_module(module_name)
+        getattr(module, function_name)()
 
 # Initialize session state variables
-if "current_question_index" not in st.session_state:
-    st.session_state.current_question_index = 0
+with profiler.span("session init"):
+    if "current_question_index" not in st.session_state:
+        st.session_state.current_question_index = 0
 
-if "intake_answers" not in st.session_state:
-    st.session_state.intake_answers = {}
+    if "intake_answers" not in st.session_state:
+        st.session_state.intake_answers = {}
 
-if "chat_history" not in st.session_state:
-    st.session_state.chat_history = []
+    # Both conversations are bounded; see modules.conversation_memory. The
+    # intake transcript is only displayed, so it keeps every turn up to the
+    # character cap instead of a prompt-sized window
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = ConversationMemory(summarize=False, window_tokens=0)
 
-if "llm_messages" not in st.session_state:
-    st.session_state.llm_messages = [
-        {"role": "system", "content": "You are a helpful and empathetic legal assistant specializing in name change processes."}
-    ]
+    if "llm_messages" not in st.session_state:
+        st.session_state.llm_messages = ConversationMemory(
+            system_prompt="You are a helpful and empathetic legal assistant specializing in name change processes."
+        )
 
-if "todo_items" not in st.session_state:
-    st.session_state.todo_items = []
+    if "todo_items" not in st.session_state:
+        st.session_state.todo_items = []
 
 # Page configuration
 st.set_page_config(
@@ -34,7 +89,8 @@ st.set_page_config(
 )
 
 # Custom CSS for simple, readable theme
-st.markdown("""
+with profiler.span("custom css"):
+    st.markdown("""
 <style>
     /* Base theme overrides */
     .stApp {
@@ -199,51 +255,19 @@ with st.sidebar:
     st.header("Navigation")
     selected_module = st.radio(
         "Choose a Module",
-        [
-            "Intake Form",
-            "AI Support",
-            "Emotional Support",
-            "Legal Information",
-            "Voting Rights",
-            "Todo List",
-            "Form Preview"
-        ]
+        list(PAGES)
     )
 
-# Module descriptions
-module_descriptions = {
-    "Intake Form": "Start here! Fill out basic information about your name change process.",
-    "AI Support": "Get AI-powered assistance and answers to your questions.",
-    "Emotional Support": "Find resources and support for your journey.",
-    "Legal Information": "Access state-specific legal requirements and procedures.",
-    "Voting Rights": "Learn about updating your voter registration after a name change.",
-    "Todo List": "Track your progress with a customized checklist.",
-    "Form Preview": "Preview and download your completed forms."
-}
-
 # Display module description
 st.markdown(f"""
     <div class="info-box">
         <h3>{selected_module}</h3>
-        <p>{module_descriptions[selected_module]}</p>
+        <p>{PAGES[selected_module][2]}</p>
     </div>
 """, unsafe_allow_html=True)
 
 # Render selected module
-if selected_module == "Intake Form":
-    render_intake_form()
-elif selected_module == "AI Support":
-    render_ai_support()
-elif selected_module == "Emotional Support":
-    render_emotional_support()
-elif selected_module == "Legal Information":
-    render_legal_info()
-elif selected_module == "Voting Rights":
-    render_voting_rights()
-elif selected_module == "Todo List":
-    render_todo_list()
-elif selected_module == "Form Preview":
-    render_form_preview()
+render_page(selected_module)
 
 # Footer
 st.markdown("---")
@@ -251,4 +275,6 @@ st.markdown("""
 <div style='text-align: center; color: #2c3e50; padding: 20px;'>
     Made with care to support your name change journey
 </div>
-""", unsafe_allow_html=True) 
\ No newline at end of file
+""", unsafe_allow_html=True) 
+
+profiler.finish()
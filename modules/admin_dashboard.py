@@ -0,0 +1,119 @@
+import hmac
+import time
+
+import streamlit as st
+from modules.llm_gateway import call_metrics, config, pending_tasks, percentile, request_scheduler
+
+WINDOWS = {
+    "Last 5 minutes": 5 * 60,
+    "Last 15 minutes": 15 * 60,
+    "Last hour": 60 * 60,
+}
+
+CACHE_HITS = ("memory", "disk")
+
+def _authenticated():
+    if st.session_state.get("admin_authenticated"):
+        return True
+    password = st.text_input("Operator password", type="password")
+    if password and hmac.compare_digest(password.encode("utf-8"), config.ADMIN_PASSWORD.encode("utf-8")):
+        st.session_state.admin_authenticated = True
+        return True
+    if password:
+        st.error("Incorrect password.")
+    return False
+
+def _module_rows(calls, minutes):
+    """Aggregate calls per page module"""
+    by_module = {}
+    for call in calls:
+        by_module.setdefault(call.caller.split(".")[0], []).append(call)
+
+    rows = []
+    for module, module_calls in sorted(by_module.items()):
+        latencies = [call.latency * 1000 for call in module_calls]
+        hits = sum(1 for call in module_calls if call.cache in CACHE_HITS)
+        rows.append({
+            "Module": module,
+            "Calls/min": round(len(module_calls) / minutes, 2),
+            "p50 (ms)": round(percentile(latencies, 50)),
+            "p95 (ms)": round(percentile(latencies, 95)),
+            "Cache hit %": round(100 * hits / len(module_calls)),
+            "Tokens": sum(call.prompt_tokens + call.completion_tokens for call in module_calls),
+            "Errors": sum(1 for call in module_calls if call.error),
+        })
+    return rows
+
+def render_admin_dashboard():
+    st.header("Performance Dashboard")
+    st.write("Live aggregates of the model calls made by this server process.")
+
+    if not _authenticated():
+        return
+
+    window_label = st.selectbox("Time window", list(WINDOWS), index=1)
+    window = WINDOWS[window_label]
+    st.button("Refresh")
+
+    now = time.time()
+    calls = call_metrics.recent(since=now - window)
+    last_hour = call_metrics.recent(since=now - 60 * 60)
+
+    # Live gauges
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric(
+        "In-flight calls",
+        call_metrics.in_flight(),
+        help="Model calls started and not finished, streamed replies included",
+    )
+    col2.metric(
+        "Worker pool tasks",
+        pending_tasks(),
+        help="Section fills, prefetches and summaries queued or running on the shared worker pool",
+    )
+    col3.metric("Queued for rate budget", request_scheduler.queue_depth())
+    hits = sum(1 for call in calls if call.cache in CACHE_HITS)
+    col4.metric("Cache hit ratio", f"{100 * hits / len(calls):.0f}%" if calls else "n/a")
+    col5.metric(
+        "Tokens in the last hour",
+        f"{sum(call.prompt_tokens + call.completion_tokens for call in last_hour):,}",
+        help=f"Estimated spend ${sum(call.cost for call in last_hour):.2f}",
+    )
+
+    if not calls:
+        st.info("No model calls recorded in this window yet.")
+        return
+
+    retained = call_metrics.recent()
+    if len(retained) >= config.METRICS_RECENT_CALLS and retained[0].timestamp >= now - window:
+        st.caption(f"Only the most recent {config.METRICS_RECENT_CALLS} calls are kept; older calls in this window are not shown.")
+
+    # Per-module breakdown
+    st.subheader("By Module")
+    st.dataframe(_module_rows(calls, window / 60), hide_index=True)
+
+    # Token spend over time, one bar per minute
+    st.subheader("Token Spend")
+    per_minute = {}
+    for call in calls:
+        minute = time.strftime("%H:%M", time.localtime(call.timestamp))
+        per_minute[minute] = per_minute.get(minute, 0) + call.prompt_tokens + call.completion_tokens
+    st.bar_chart(per_minute)
+
+    # Slowest calls that actually reached the API
+    st.subheader("Slowest Recent Prompts")
+    slowest = sorted((call for call in calls if call.cache == "miss"), key=lambda call: call.latency, reverse=True)[:10]
+    st.dataframe(
+        [
+            {
+                "Caller": call.caller,
+                "Model": call.model,
+                "Latency (ms)": round(call.latency * 1000),
+                "First token (ms)": round(call.ttft * 1000) if call.ttft is not None else None,
+                "Error": call.error or "",
+                "Prompt": call.prompt[:160],
+            }
+            for call in slowest
+        ],
+        hide_index=True,
+    )
@@ -1,17 +1,13 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
+from modules.conversation_memory import ConversationMemory
+from modules.llm_gateway import BALANCED, get_ai_client, stream_chat_completion
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
+def intake_context(answers):
+    """One-line note about the user's situation, pinned to the conversation instead of repeated in each question"""
+    details = [f"{label}: {answers[key]}" for key, label in (("state", "State"), ("reason", "Reason for the name change")) if answers.get(key)]
+    if not details:
+        return ""
+    return "What the user told us during intake. " + "; ".join(details) + "."
 
 def render_ai_support():
     st.header("AI Support")
@@ -26,29 +22,49 @@ def render_ai_support():
     - How much does a legal name change cost?
     """)
 
-    # User input
-    user_question = st.text_input("Type your question here:")
-    
+    memory = st.session_state.llm_messages
+    memory.context = intake_context(st.session_state.get("intake_answers", {}))
+
+    # Conversation so far; older turns live on in the memory's summary
+    for message in memory:
+        with st.chat_message(message["role"]):
+            st.write(message["content"])
+
+    user_question = st.chat_input("Type your question here...")
     if user_question:
         client = get_ai_client()
         if client:
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant specializing in name change processes."},
-                        {"role": "user", "content": user_question}
-                    ]
-                )
-                st.write("Answer:", response.choices[0].message.content)
-            except Exception as e:
-                st.error(f"Error getting response: {str(e)}")
+            question = {"role": "user", "content": user_question}
+            with st.chat_message("user"):
+                st.write(user_question)
+            with st.chat_message("assistant"):
+                try:
+                    # Only the pinned context, a summary and the recent window are sent
+                    messages = memory.prompt_messages() + [question]
+                    answer = st.write_stream(stream_chat_completion(messages, tier=BALANCED, client=client))
+                except Exception as e:
+                    answer = None
+                    st.error(f"Error getting response: {str(e)}")
+            # A question that got no answer is left out, so it is not resent
+            # with every later turn
+            if answer:
+                memory.append(question)
+                memory.append({"role": "assistant", "content": answer})
+
+    if memory and st.button("Start a new conversation"):
+        memory.clear()
+        st.rerun()
 
 # Main entry point
 if __name__ == "__main__":
     # Initialize session state for intake answers if it doesn't exist
     if "intake_answers" not in st.session_state:
         st.session_state.intake_answers = {}
+
+    if "llm_messages" not in st.session_state:
+        st.session_state.llm_messages = ConversationMemory(
+            system_prompt="You are a helpful and empathetic legal assistant specializing in name change processes."
+        )
     
     # Run the main application
     render_ai_support() 
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""Measure how long each page takes to render and how many model calls it makes.
+
+Drives app.py through every sidebar entry with Streamlit's AppTest against
+the bundled fake OpenAI server (see modules.fake_openai), so no network or
+API quota is needed:
+
+    python -m modules.benchmark --runs 5 --output benchmark.json
+
+Each sample is a fresh session visiting the page with a completed intake,
+followed by a plain rerun of the same page. For both the report gives
+p50/p95 wall time, LLM calls, prompt/completion tokens and peak Python
+memory. Process-wide response caches are cleared before every sample
+unless --keep-cache is given.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from modules.fake_openai import start_server
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+PAGES = [
+    "Intake Form",
+    "AI Support",
+    "Emotional Support",
+    "Legal Information",
+    "Voting Rights",
+    "Todo List",
+    "Form Preview",
+]
+
+# A completed intake, so pages that depend on it render their full content
+SAMPLE_ANSWERS = {
+    "reason": "Marriage",
+    "current_name": "Jordan Avery Smith",
+    "new_name": "Jordan Avery Lee",
+    "state": "California",
+    "voting_concerns": "Yes",
+}
+
+
+def _summarize(samples):
+    from modules.llm_gateway import percentile
+
+    timings = [s["wall_ms"] for s in samples]
+    count = len(samples)
+    return {
+        "p50_ms": round(percentile(timings, 50), 1),
+        "p95_ms": round(percentile(timings, 95), 1),
+        "mean_ms": round(sum(timings) / count, 1),
+        "llm_calls": sum(s["llm_calls"] for s in samples) / count,
+        "prompt_tokens": sum(s["prompt_tokens"] for s in samples) / count,
+        "completion_tokens": sum(s["completion_tokens"] for s in samples) / count,
+        "peak_memory_kib": max(s["peak_memory_kib"] for s in samples),
+        "exceptions": sum(s["exceptions"] for s in samples),
+    }
+
+
+def _settle(timeout=60):
+    """Wait until no model call or pooled task is still running in this process"""
+    from modules.llm_gateway import completions_in_flight, pending_tasks
+
+    deadline = time.monotonic() + timeout
+    while (pending_tasks() or completions_in_flight.in_flight()) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _measure(run):
+    """Run one script execution and return its wall time, model usage and peak memory.
+
+    Background calls left over from earlier runs are waited out first, so
+    every API call that starts during the measurement was caused by it. The
+    run's own background calls are waited for afterwards and counted too.
+    """
+    from modules.llm_gateway import call_metrics
+
+    _settle()
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    since = time.time()
+    started = time.perf_counter()
+    at = run()
+    wall_ms = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1]
+    _settle()
+    calls = [call for call in call_metrics.recent(since=since) if call.cache == "miss"]
+    return {
+        "wall_ms": wall_ms,
+        "llm_calls": len(calls),
+        "prompt_tokens": sum(call.prompt_tokens for call in calls),
+        "completion_tokens": sum(call.completion_tokens for call in calls),
+        "peak_memory_kib": round(max(0, peak - baseline) / 1024, 1),
+        "exceptions": len(at.exception),
+    }
+
+
+def benchmark_page(page, runs, keep_cache=False, timeout=120):
+    """Return visit and rerun summaries for one sidebar page"""
+    from streamlit.testing.v1 import AppTest
+
+    from modules.llm_gateway import response_cache
+
+    visits, reruns = [], []
+    for _ in range(runs):
+        if not keep_cache:
+            response_cache.clear()
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        # The first run lands on the intake page and sets up session state
+        at.run()
+        at.session_state["intake_answers"] = dict(SAMPLE_ANSWERS)
+        at.sidebar.radio[0].set_value(page)
+        visits.append(_measure(at.run))
+        reruns.append(_measure(at.run))
+    return {"visit": _summarize(visits), "rerun": _summarize(reruns)}
+
+
+def run_benchmark(pages, runs=5, keep_cache=False, server_options=None):
+    """Benchmark each page against a fresh fake server and return the results"""
+    server = start_server(**(server_options or {}))
+    # Must be set before the gateway is imported, since settings are read at import time
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ["LLM_DISK_CACHE_PATH"] = ""
+
+    tracemalloc.start()
+    try:
+        results = {}
+        for page in pages:
+            results[page] = benchmark_page(page, runs, keep_cache=keep_cache)
+            visit = results[page]["visit"]
+            print(
+                f"{page:<18} p50 {visit['p50_ms']:>8.1f}ms  p95 {visit['p95_ms']:>8.1f}ms  "
+                f"calls {visit['llm_calls']:>5.1f}  rerun calls {results[page]['rerun']['llm_calls']:>4.1f}",
+                file=sys.stderr,
+            )
+    finally:
+        tracemalloc.stop()
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "runs": runs,
+        "keep_cache": keep_cache,
+        "fake_server": server_options or {},
+        "pages": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark render latency and LLM usage for every page.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh sessions measured per page")
+    parser.add_argument("--page", action="append", choices=PAGES, help="Only benchmark this page (repeatable)")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--keep-cache", action="store_true", help="Keep the process response cache between samples")
+    parser.add_argument("--latency", type=float, default=0.2, help="Median first-token latency of the fake server")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Generation speed of the fake server")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake server latency")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(
+        args.page or PAGES,
+        runs=args.runs,
+        keep_cache=args.keep_cache,
+        server_options={"latency": args.latency, "tokens_per_second": args.tokens_per_second, "seed": args.seed},
+    )
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+    else:
+        print(report)
+    return 1 if any(r["visit"]["exceptions"] or r["rerun"]["exceptions"] for r in results["pages"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
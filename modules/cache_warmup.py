@@ -0,0 +1,86 @@
+"""Pre-populate the response cache before a process takes traffic.
+
+Runs every registered state/reason section (see modules.content_pack) for
+every state and reason so the first visitor after a deploy is served from
+the cache:
+
+    python -m modules.cache_warmup --workers 4 --requests-per-minute 120
+
+Answers are stored in the on-disk cache shared by every worker on the
+node, so the command refuses to run when that cache is disabled. Sections
+already served by the content pack are skipped.
+
+Pacing and retries are left to the gateway: --requests-per-minute and
+--tokens-per-minute set the budgets of its request scheduler for this run,
+and failed calls are retried with backoff up to LLM_MAX_RETRIES times.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules import content_pack
+from modules.llm_gateway import BACKGROUND, capture_errors, disk_cache, priority, request_scheduler
+
+
+def warm_section(fn, args):
+    """Generate one section and return (content, error)"""
+    with priority(BACKGROUND), capture_errors() as errors:
+        content = fn(*args)
+    if content:
+        return content, None
+    return None, errors[0] if errors else "empty response"
+
+
+def warm_cache(workers=4, requests_per_minute=60, tokens_per_minute=None):
+    """Warm every deterministic section and return the number that failed"""
+    request_scheduler.requests_per_minute = requests_per_minute
+    if tokens_per_minute is not None:
+        request_scheduler.tokens_per_minute = tokens_per_minute
+    calls = [
+        (name, fn, args)
+        for name, fn, args in content_pack.iter_section_calls()
+        if content_pack.lookup(name, args) is None
+    ]
+    started = time.monotonic()
+
+    def run(call):
+        name, fn, args = call
+        content, error = warm_section(fn, args)
+        return name, args, error
+
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for done, (name, args, error) in enumerate(executor.map(run, calls), start=1):
+            if error:
+                failures += 1
+                print(f"[{done}/{len(calls)}] {name}{args}: {error}", file=sys.stderr)
+
+    elapsed = time.monotonic() - started
+    print(f"Warmed {len(calls) - failures}/{len(calls)} sections in {elapsed:.1f}s")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-populate the LLM response cache for every state/reason section.")
+    parser.add_argument("--workers", type=int, default=4, help="Prompts to generate at once")
+    parser.add_argument("--requests-per-minute", type=int, default=60, help="Upper bound on API calls per minute (0 for no limit)")
+    parser.add_argument("--tokens-per-minute", type=int, help="Upper bound on tokens per minute (default: LLM_TOKENS_PER_MINUTE)")
+    parser.add_argument("--list", action="store_true", help="Only list the registered sections")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, _ in content_pack.iter_sections():
+            print(name)
+        return 0
+    if disk_cache is None:
+        # The in-memory cache goes away with this process, so the calls
+        # would be paid for without warming anything for the app
+        print("The on-disk cache is disabled (LLM_DISK_CACHE_PATH is empty); nothing would stay warm.",
+              file=sys.stderr)
+        return 1
+    return 1 if warm_cache(args.workers, args.requests_per_minute, args.tokens_per_minute) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
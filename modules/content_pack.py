@@ -0,0 +1,190 @@
+"""Precomputed answers for sections that depend only on state and reason.
+
+The intake options are a closed set, so every such section can be generated
+once offline into a versioned content pack:
+
+    python -m modules.content_pack --output data/content_pack.json.gz
+
+The app loads the pack once per process and serves matching sections from it
+with no model call; anything not in the pack falls back to live generation.
+"""
+import argparse
+import functools
+import gzip
+import importlib
+import inspect
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+from modules.llm_gateway import config
+
+logger = logging.getLogger(__name__)
+
+PACK_FORMAT_VERSION = 1
+
+STATES = ["California", "New York", "Texas", "Florida", "Other"]
+REASONS = ["Marriage", "Divorce", "Gender Identity", "Personal Choice", "Other"]
+
+# Values each section parameter can take when the pack is built
+PARAMETER_OPTIONS = {
+    "state": STATES,
+    "reason": REASONS,
+}
+
+# Page modules whose sections are registered with @pack_section
+SECTION_MODULES = [
+    "modules.legal_info",
+    "modules.voting_rights",
+    "modules.todo_list",
+    "modules.form_preview",
+]
+
+# Section name -> undecorated generator function
+SECTIONS = {}
+
+_pack = None
+_pack_lock = threading.Lock()
+
+
+def section_name(fn):
+    """Name a section after its page module and helper, e.g. voting_rights.get_voting_faqs"""
+    return f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__name__}"
+
+
+def _entry_key(args):
+    return "|".join(args)
+
+
+def pack_section(fn):
+    """Register a helper whose output depends only on its state/reason arguments.
+
+    The decorated helper answers from the loaded content pack when it can and
+    calls the model otherwise.
+    """
+    for parameter in inspect.signature(fn).parameters:
+        if parameter not in PARAMETER_OPTIONS:
+            raise ValueError(f"{fn.__name__} has parameter {parameter!r} that the content pack cannot enumerate")
+
+    name = section_name(fn)
+    SECTIONS[name] = fn
+
+    @functools.wraps(fn)
+    def wrapper(*args):
+        content = lookup(name, args)
+        if content is not None:
+            return content
+        return fn(*args)
+
+    return wrapper
+
+
+def load_pack(path=None):
+    """Read a content pack from disk, or return None if it is missing or stale"""
+    path = path or config.CONTENT_PACK_PATH
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            pack = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not read content pack %s: %s", path, e)
+        return None
+
+    if pack.get("format_version") != PACK_FORMAT_VERSION:
+        logger.warning("Ignoring content pack %s with unsupported format", path)
+        return None
+    if pack.get("prompt_template_version") != config.PROMPT_TEMPLATE_VERSION:
+        logger.warning("Ignoring content pack %s built for other prompt templates", path)
+        return None
+    return pack
+
+
+def get_pack():
+    """Return the process-wide content pack, loading it on first use"""
+    global _pack
+    if _pack is None:
+        with _pack_lock:
+            if _pack is None:
+                _pack = load_pack() or {"sections": {}}
+    return _pack
+
+
+def lookup(name, args):
+    """Return the precomputed answer for a section, or None"""
+    return get_pack()["sections"].get(name, {}).get(_entry_key(args))
+
+
+def iter_sections():
+    """Import every page module and yield (name, fn) for each registered section"""
+    for module_name in SECTION_MODULES:
+        importlib.import_module(module_name)
+    yield from sorted(SECTIONS.items())
+
+
+def iter_section_calls():
+    """Yield (name, fn, args) for every section and every combination of its inputs"""
+    for name, fn in iter_sections():
+        parameters = list(inspect.signature(fn).parameters)
+        for args in itertools.product(*(PARAMETER_OPTIONS[p] for p in parameters)):
+            yield name, fn, args
+
+
+def build_pack(output, workers=None):
+    """Generate every section answer and write them to a compressed pack.
+
+    Returns the number of answers that could not be generated.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from modules.llm_gateway import BACKGROUND, capture_errors, priority
+
+    def generate(call):
+        name, fn, args = call
+        with priority(BACKGROUND), capture_errors() as errors:
+            content = fn(*args)
+        return name, args, content, errors
+
+    calls = list(iter_section_calls())
+    sections = {}
+    failures = 0
+    with ThreadPoolExecutor(max_workers=workers or config.FANOUT_MAX_WORKERS) as executor:
+        for done, (name, args, content, errors) in enumerate(executor.map(generate, calls), start=1):
+            if content:
+                sections.setdefault(name, {})[_entry_key(args)] = content
+            else:
+                failures += 1
+                print(f"[{done}/{len(calls)}] {name}{args}: {errors[0] if errors else 'empty response'}", file=sys.stderr)
+
+    pack = {
+        "format_version": PACK_FORMAT_VERSION,
+        "prompt_template_version": config.PROMPT_TEMPLATE_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "sections": sections,
+    }
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(pack, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, output)
+
+    print(f"Wrote {len(calls) - failures}/{len(calls)} answers to {output}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the precomputed state/reason content pack.")
+    parser.add_argument("--output", default=config.CONTENT_PACK_PATH, help="Path of the pack to write")
+    parser.add_argument("--workers", type=int, default=None, help="Prompts to generate at once")
+    args = parser.parse_args(argv)
+    return 1 if build_pack(args.output, workers=args.workers) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
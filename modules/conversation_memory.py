@@ -0,0 +1,198 @@
+"""Bounded per-session conversation history.
+
+A ConversationMemory keeps the most recent messages within a token window.
+Older turns are folded into a short rolling summary, so the prompt built
+from it stays the same size however long a user chats:
+
+    memory = ConversationMemory(system_prompt="You are ...")
+    memory.append({"role": "user", "content": question})
+    reply = chat_completion(memory.prompt_messages(), tier=BALANCED)
+
+Summaries are generated on the shared worker pool, so nobody waits for
+them: turns being folded stay in the prompt until their summary is ready
+and it is picked up on a later turn. A hard character cap bounds what one
+session can hold even when summarization is off or failing. Tokens are
+counted with tiktoken when it is installed and its encoding can be loaded,
+and estimated at ~4 characters per token otherwise.
+"""
+import logging
+import threading
+
+from modules.llm_gateway import BACKGROUND, FAST, ask, config, submit_with_priority
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a user and an assistant
+                about a legal name change. Merge the earlier summary with the new turns.
+                Keep facts the assistant will need later: the user's state, reason, names, decisions and open questions.
+                Write at most a short paragraph, no preamble."""
+
+# Tokens added per message for the chat format's role and separators
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model):
+    """The model's tiktoken encoding, or None when it cannot be loaded"""
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # tiktoken downloads its encodings on first use, which fails
+                # on hosts without network access
+                logger.warning("Could not load a tiktoken encoding for %s, estimating tokens: %s", model, e)
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text, model=None):
+    """Tokens in text for the given model, estimated when tiktoken is unavailable"""
+    if not text:
+        return 0
+    encoding = _encoding(model or config.MODEL_BALANCED) if tiktoken is not None else None
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text))
+
+
+class ConversationMemory:
+    """Recent messages within a token window, plus a summary of everything older.
+
+    Iterating yields the retained messages, so the memory can stand in for a
+    plain list of {"role", "content"} dicts when a page redraws a chat.
+    With summarize=False, turns leaving the window are dropped instead of
+    summarized. window_tokens=0 turns the token window off, leaving only the
+    character cap, which suits transcripts that are only displayed.
+
+    context is a short note about the user that is sent with every prompt,
+    right after the system prompt, and never folded into the summary.
+    """
+
+    def __init__(self, system_prompt=None, window_tokens=None, summary_tokens=None, max_chars=None,
+                 summarize=True, model=None):
+        self.system_prompt = system_prompt
+        self.window_tokens = config.MEMORY_WINDOW_TOKENS if window_tokens is None else window_tokens
+        self.summary_tokens = config.MEMORY_SUMMARY_TOKENS if summary_tokens is None else summary_tokens
+        self.max_chars = config.MEMORY_MAX_CHARS if max_chars is None else max_chars
+        self.summarize = summarize
+        self.model = model
+        self.context = ""
+        self.summary = ""
+        self._messages = []
+        self._tokens = []
+        # Turns handed to the summarizer, and the future that summarizes them
+        self._folding = []
+        self._summary_future = None
+
+    def __iter__(self):
+        return iter(list(self._messages))
+
+    def __len__(self):
+        return len(self._messages)
+
+    def __bool__(self):
+        return bool(self._messages or self._folding or self.summary)
+
+    def append(self, message):
+        """Add a {"role", "content"} message, folding older turns away if the window overflows"""
+        content = message.get("content") or ""
+        # No single message may take more than half of the session's budget
+        limit = self.max_chars // 2
+        if len(content) > limit:
+            content = content[:limit] + " [truncated]"
+        message = {"role": message["role"], "content": content}
+        self._messages.append(message)
+        self._tokens.append(count_tokens(content, self.model) + MESSAGE_OVERHEAD_TOKENS)
+        self._compact()
+
+    def clear(self):
+        self.context = ""
+        self.summary = ""
+        self._messages = []
+        self._tokens = []
+        self._folding = []
+        self._summary_future = None
+
+    def char_count(self):
+        return len(self.context) + len(self.summary) + sum(
+            len(message["content"]) for message in self._folding + self._messages
+        )
+
+    def prompt_messages(self):
+        """Messages to send to the model: system prompt, context, summary of older turns, then the window.
+
+        Turns whose summary is still being generated are sent as they are.
+        """
+        self._apply_summary()
+        messages = []
+        if self.system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+        if self.context:
+            messages.append({"role": "system", "content": self.context})
+        if self.summary:
+            messages.append({"role": "system", "content": f"Summary of the conversation so far:\n{self.summary}"})
+        return messages + [dict(message) for message in self._folding + self._messages]
+
+    def _compact(self):
+        self._apply_summary()
+        # While a summary is being generated the window may run over; the
+        # next one starts once it has been applied
+        if (
+            self.window_tokens > 0
+            and self._summary_future is None
+            and sum(self._tokens) > self.window_tokens
+            and len(self._messages) > 1
+        ):
+            # Fold the oldest half of the window at once, so summaries are
+            # requested every few turns rather than on every message
+            folded = []
+            while len(self._messages) > 1 and sum(self._tokens) > self.window_tokens // 2:
+                folded.append(self._messages.pop(0))
+                self._tokens.pop(0)
+            if self.summarize:
+                self._folding = folded
+                self._summary_future = submit_with_priority(
+                    BACKGROUND, summarize_turns, self.summary, list(folded), self.summary_tokens
+                )
+
+        # Hard cap, whatever the tokenizer or the summarizer did
+        while self._folding and self.char_count() > self.max_chars:
+            self._folding.pop(0)
+        while len(self._messages) > 1 and self.char_count() > self.max_chars:
+            self._messages.pop(0)
+            self._tokens.pop(0)
+
+    def _apply_summary(self):
+        """Swap the folded turns for their summary once it has been generated"""
+        future = self._summary_future
+        if future is None or not future.done():
+            return
+        self._summary_future = None
+        self._folding = []
+        try:
+            summary, errors = future.result()
+        except Exception as e:
+            summary, errors = None, [str(e)]
+        if not summary:
+            # The folded turns are dropped; the previous summary still stands
+            logger.warning("Could not summarize conversation: %s", errors[0] if errors else "empty response")
+            return
+        self.summary = summary[: self.summary_tokens * 8]
+
+
+def summarize_turns(summary, turns, max_tokens):
+    """Merge turns into the running summary with one fast-tier call"""
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in turns)
+    prompt = f"Earlier summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"
+    return ask(SUMMARY_PROMPT, prompt, tier=FAST, temperature=0.2, max_tokens=max_tokens)
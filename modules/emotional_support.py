@@ -1,48 +1,22 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
 from datetime import datetime
+from modules.llm_gateway import BALANCED, FAST, ask, get_ai_client
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
-
-def get_ai_response(prompt, client):
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": """You are an empathetic and supportive counselor specializing in helping people through name changes.
+SYSTEM_PROMPT = """You are an empathetic and supportive counselor specializing in helping people through name changes.
                 Your responses should be warm, understanding, and validating while providing practical emotional support.
-                Focus on the emotional and psychological aspects of name changes, identity, and self-determination."""},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating response: {str(e)}")
-        return None
+                Focus on the emotional and psychological aspects of name changes, identity, and self-determination."""
 
-def get_personalized_quote(reason, client):
+def get_personalized_quote(reason):
     prompt = f"Generate an inspiring and empathetic quote about identity and self-determination, specifically tailored for someone changing their name due to {reason}. The quote should be concise (max 2 sentences) and uplifting."
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, tier=FAST, temperature=0.7, report_errors=True)
 
-def get_personalized_story(reason, client):
+def get_personalized_story(reason):
     prompt = f"Share a brief, realistic story about someone who changed their name due to {reason}. Include their emotional journey, challenges they faced, and how they overcame them. Keep it under 200 words and make it relatable and encouraging."
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
 
-def get_personalized_advice(reason, feeling, client):
+def get_personalized_advice(reason, feeling):
     prompt = f"Provide empathetic and practical advice for someone who is changing their name due to {reason} and is feeling {feeling}. Address their emotional needs while offering concrete coping strategies."
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
 
 def render_emotional_support():
     st.header("Emotional Support")
@@ -59,14 +33,13 @@ def render_emotional_support():
         client = get_ai_client()
         if client and st.button("Get Personalized Support"):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are an empathetic assistant providing emotional support for people going through name changes."},
-                        {"role": "user", "content": f"I'm feeling {feeling} about my name change process. Can you provide some encouragement and support?"}
-                    ]
+                answer = ask(
+                    "You are an empathetic assistant providing emotional support for people going through name changes.",
+                    f"I'm feeling {feeling} about my name change process. Can you provide some encouragement and support?",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("Support Message:", response.choices[0].message.content)
+                st.write("Support Message:", answer)
             except Exception as e:
                 st.error(f"Error getting response: {str(e)}")
 
@@ -85,14 +58,13 @@ def render_emotional_support():
         client = get_ai_client()
         if client:
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are an empathetic assistant providing positive affirmations for people changing their names."},
-                        {"role": "user", "content": "Generate a positive affirmation for someone changing their name."}
-                    ]
+                answer = ask(
+                    "You are an empathetic assistant providing positive affirmations for people changing their names.",
+                    "Generate a positive affirmation for someone changing their name.",
+                    tier=FAST,
+                    client=client
                 )
-                st.write("Your Affirmation:", response.choices[0].message.content)
+                st.write("Your Affirmation:", answer)
             except Exception as e:
                 st.error(f"Error getting affirmation: {str(e)}")
 
@@ -110,7 +82,7 @@ def render_emotional_support():
     # Share others' experiences
     st.subheader("Stories from Others Who've Changed Their Names")
     if st.button("Read a Story"):
-        story = get_personalized_story(user_reason, client)
+        story = get_personalized_story(user_reason)
         if story:
             with st.expander("A Story That Might Resonate With You", expanded=True):
                 st.write(story)
@@ -122,7 +94,7 @@ def render_emotional_support():
     if st.button("Get Coping Strategies"):
         with st.expander("Coping Strategies for Your Journey", expanded=True):
             strategy_prompt = f"Provide 3-4 specific coping strategies for managing emotions during a name change process, particularly for someone changing their name due to {user_reason}."
-            strategies = get_ai_response(strategy_prompt, client)
+            strategies = ask(SYSTEM_PROMPT, strategy_prompt, tier=BALANCED, temperature=0.7, report_errors=True)
             if strategies:
                 st.write(strategies)
     
@@ -137,7 +109,7 @@ def render_emotional_support():
     
     if st.button("Celebrate Your Progress 🎉"):
         celebration_prompt = f"Generate a short, personalized celebration message for someone who is making progress in their name change journey due to {user_reason}."
-        celebration_message = get_ai_response(celebration_prompt, client)
+        celebration_message = ask(SYSTEM_PROMPT, celebration_prompt, tier=FAST, temperature=0.7, report_errors=True)
         if celebration_message:
             st.success(celebration_message)
             st.balloons() 
\ No newline at end of file
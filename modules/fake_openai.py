@@ -0,0 +1,305 @@
+"""Local stand-in for the OpenAI chat completions API.
+
+Serves /v1/chat/completions with made-up replies so every page can be
+exercised end to end without network access or API quota:
+
+    python -m modules.fake_openai --port 8765 --latency 0.8 --tokens-per-second 40
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake streamlit run app.py
+
+Latency to the first token follows a log-normal distribution around the
+given median, replies stream at a fixed token rate, and a share of
+requests can be failed with 429s, 500s or hung until the client times out.
+Counters for served requests are available as JSON from /stats.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_WORDS = (
+    "file the petition with your county court and bring a certified copy of your "
+    "birth certificate government issued photo identification proof of residence "
+    "update social security first then your driver license passport bank accounts "
+    "voter registration employer records and keep several certified copies of the order"
+).split()
+
+
+def _reply_text(messages, length):
+    """Build a deterministic numbered-list reply of about `length` words for the prompt"""
+    seed = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    rng = random.Random(seed)
+    lines, line, item = [], [], 1
+    for _ in range(length):
+        if not line:
+            line.append(f"{item}.")
+            item += 1
+        line.append(rng.choice(_WORDS))
+        if len(line) >= 12:
+            lines.append(" ".join(line))
+            line = []
+    if line:
+        lines.append(" ".join(line))
+    return "\n".join(lines)
+
+
+def _count_tokens(messages):
+    # Rough estimate, close enough for budgets and benchmarks
+    return sum(len(str(m.get("content", ""))) for m in messages) // 4 + 1
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """HTTP server answering chat completion requests with simulated latency and failures"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.5, latency_sigma=0.3, tokens_per_second=50.0, reply_tokens=200,
+                 rate_limit_rate=0.0, server_error_rate=0.0, timeout_rate=0.0, hang_seconds=120.0,
+                 retry_after=1.0, seed=None):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "completed": 0,
+            "streamed": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "rate_limited": 0,
+            "server_errors": 0,
+            "timeouts": 0,
+        }
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def stats(self):
+        """Return a snapshot of the request counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def count(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def handle_error(self, request, client_address):
+        # Clients dropping idle keep-alive connections is routine, not worth a traceback
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+    def draw_fault(self):
+        """Pick the failure to inject for one request: 'timeout', 'rate_limit', 'server_error' or None"""
+        with self._lock:
+            roll = self._random.random()
+        for fault, rate in (("timeout", self.timeout_rate), ("rate_limit", self.rate_limit_rate),
+                            ("server_error", self.server_error_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def draw_latency(self):
+        """Seconds to wait before the first token"""
+        if self.latency <= 0:
+            return 0.0
+        with self._lock:
+            return self.latency * math.exp(self._random.gauss(0.0, self.latency_sigma))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        # Keep benchmark and load-test output readable
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error")
+            return
+        try:
+            request = json.loads(body or b"{}")
+            messages = request["messages"]
+        except (ValueError, KeyError):
+            self._send_error(400, "Request body must be JSON with a messages list", "invalid_request_error")
+            return
+
+        server = self.server
+        server.count(requests=1)
+        fault = server.draw_fault()
+        if fault == "timeout":
+            server.count(timeouts=1)
+            time.sleep(server.hang_seconds)
+            self.close_connection = True
+            return
+        if fault == "rate_limit":
+            server.count(rate_limited=1)
+            self._send_error(429, "Rate limit reached (injected)", "rate_limit_exceeded",
+                             {"Retry-After": f"{server.retry_after:g}"})
+            return
+        if fault == "server_error":
+            server.count(server_errors=1)
+            self._send_error(500, "The server had an error (injected)", "server_error")
+            return
+
+        max_tokens = request.get("max_tokens") or server.reply_tokens
+        reply_tokens = max(1, min(server.reply_tokens, max_tokens))
+        text = _reply_text(messages, reply_tokens)
+        prompt_tokens = _count_tokens(messages)
+        server.count(prompt_tokens=prompt_tokens, completion_tokens=reply_tokens)
+
+        time.sleep(server.draw_latency())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        model = request.get("model", "gpt-3.5-turbo")
+        if request.get("stream"):
+            server.count(streamed=1)
+            self._stream(completion_id, model, text)
+        else:
+            if server.tokens_per_second > 0:
+                time.sleep(reply_tokens / server.tokens_per_second)
+            server.count(completed=1)
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": reply_tokens,
+                    "total_tokens": prompt_tokens + reply_tokens,
+                },
+            })
+
+    def _stream(self, completion_id, model, text):
+        """Send the reply as server-sent events, one word per chunk at the configured token rate"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(delta, finish_reason=None):
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        interval = 1.0 / self.server.tokens_per_second if self.server.tokens_per_second > 0 else 0.0
+        try:
+            self._write_event(chunk({"role": "assistant", "content": ""}))
+            pieces = text.split(" ")
+            for i, piece in enumerate(pieces):
+                self._write_event(chunk({"content": piece if i == 0 else " " + piece}))
+                if interval:
+                    time.sleep(interval)
+            self._write_event(chunk({}, "stop"))
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hung up mid-stream, e.g. the user navigated away
+            self.close_connection = True
+
+    def _write_event(self, payload):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, code, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": code, "param": None, "code": code}}, headers)
+
+
+def start_server(host="127.0.0.1", port=0, **options):
+    """Start a fake server on a background thread and return it; port 0 picks a free port"""
+    server = FakeOpenAIServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, name="fake-openai", daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake OpenAI chat completions API for offline testing.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.5, help="Median seconds before the first token")
+    parser.add_argument("--latency-sigma", type=float, default=0.3, help="Spread of the log-normal latency (0 for fixed)")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0, help="Generation speed (0 for instant)")
+    parser.add_argument("--reply-tokens", type=int, default=200, help="Reply length in tokens, capped by max_tokens")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests that hang until the client gives up")
+    parser.add_argument("--hang-seconds", type=float, default=120.0, help="How long a hung request stays open")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with injected 429s")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible latency and fault injection")
+    args = parser.parse_args(argv)
+
+    server = FakeOpenAIServer(
+        (args.host, args.port),
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        reply_tokens=args.reply_tokens,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.hang_seconds,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Fake OpenAI API listening on {server.base_url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
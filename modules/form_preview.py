@@ -1,39 +1,16 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
 import json
+from modules.content_pack import pack_section
+from modules.llm_gateway import BALANCED, ask, get_ai_client
+from modules.section_loader import SectionLoader, render_answer_box
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
-
-def get_ai_response(prompt, client):
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": """You are a document preparation specialist focusing on name change forms.
+SYSTEM_PROMPT = """You are a document preparation specialist focusing on name change forms.
                 Provide accurate guidance for completing legal forms and documentation requirements.
                 Focus on clarity and completeness while noting the importance of verification with official sources.
-                Always include appropriate disclaimers about seeking legal review when necessary."""},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating response: {str(e)}")
-        return None
-
-def get_form_requirements(state, reason, client):
+                Always include appropriate disclaimers about seeking legal review when necessary."""
+
+@pack_section
+def get_form_requirements(state, reason):
     prompt = f"""List all required forms and supporting documents for a name change in {state} due to {reason}.
     Include:
     1. Court forms needed
@@ -42,9 +19,10 @@ def get_form_requirements(state, reason, client):
     4. Number of copies needed
     5. Any special requirements
     Note that requirements may vary by county."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_form_instructions(state, reason, client):
+@pack_section
+def get_form_instructions(state, reason):
     prompt = f"""Provide detailed instructions for completing name change forms in {state} for {reason}.
     Include:
     1. Step-by-step guidance
@@ -52,9 +30,10 @@ def get_form_instructions(state, reason, client):
     3. Special considerations for {reason}
     4. Tips for accurate completion
     5. What to do after completion"""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_filing_instructions(state, reason, client):
+@pack_section
+def get_filing_instructions(state, reason):
     prompt = f"""Explain the process of filing name change forms in {state} for {reason}.
     Include:
     1. Where to file
@@ -62,7 +41,38 @@ def get_filing_instructions(state, reason, client):
     3. Processing timeline
     4. Next steps after filing
     5. Follow-up procedures"""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+def get_petition_preview(state, reason, current_name, new_name):
+    prompt = f"""Create a preview of a Petition for Name Change form for {state} with these details:
+    Current Name: {current_name}
+    New Name: {new_name}
+    Reason: {reason}
+    Include standard legal language and formatting."""
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, report_errors=True)
+
+def get_court_order_preview(state, reason, current_name, new_name):
+    prompt = f"""Create a preview of a Court Order template for {state} with these details:
+    Current Name: {current_name}
+    New Name: {new_name}
+    Reason: {reason}
+    Include standard legal language and formatting."""
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, report_errors=True)
+
+@pack_section
+def get_final_checklist(state, reason):
+    prompt = f"""Create a final checklist for name change document preparation in {state} for {reason}.
+    Include all forms, supporting documents, copies needed, and filing requirements."""
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+@pack_section
+def get_form_resources(state, reason):
+    prompt = f"Provide 3-4 official resources for name change form preparation in {state}, particularly for {reason}."
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+def get_form_help(state, reason, question):
+    prompt = f"Answer this question about name change forms in {state} for {reason}: {question}"
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
 
 def render_form_preview():
     st.header("Form Preview")
@@ -96,14 +106,13 @@ def render_form_preview():
         client = get_ai_client()
         if client:
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant providing guidance on completing name change forms."},
-                        {"role": "user", "content": "What are the key things to remember when filling out the Social Security name change form?"}
-                    ]
+                answer = ask(
+                    "You are a helpful assistant providing guidance on completing name change forms.",
+                    "What are the key things to remember when filling out the Social Security name change form?",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("Tips:", response.choices[0].message.content)
+                st.write("Tips:", answer)
             except Exception as e:
                 st.error(f"Error getting tips: {str(e)}")
 
@@ -133,11 +142,11 @@ def render_form_preview():
         st.info("Please complete the intake form to access personalized form preparation guidance.")
         return
     
+    loader = SectionLoader()
+    
     # Form Requirements
     st.subheader("Required Forms & Documents")
-    requirements = get_form_requirements(state, reason, client)
-    if requirements:
-        st.markdown(requirements)
+    loader.add(get_form_requirements, state, reason)
     
     # Form Preview Section
     st.subheader("Form Preview")
@@ -147,19 +156,7 @@ def render_form_preview():
     
     with tab1:
         st.markdown("### Petition for Name Change")
-        # Generate petition preview
-        petition_prompt = f"""Create a preview of a Petition for Name Change form for {state} with these details:
-        Current Name: {current_name}
-        New Name: {new_name}
-        Reason: {reason}
-        Include standard legal language and formatting."""
-        petition_preview = get_ai_response(petition_prompt, client)
-        if petition_preview:
-            st.markdown(f"""
-            <div style="border: 1px solid #ccc; padding: 20px; border-radius: 5px; background-color: #f9f9f9;">
-                {petition_preview}
-            </div>
-            """, unsafe_allow_html=True)
+        loader.add(get_petition_preview, state, reason, current_name, new_name, render=_render_document)
     
     with tab2:
         st.markdown("### Social Security Card Application")
@@ -176,62 +173,45 @@ def render_form_preview():
     
     with tab3:
         st.markdown("### Court Order Template")
-        # Generate court order template
-        order_prompt = f"""Create a preview of a Court Order template for {state} with these details:
-        Current Name: {current_name}
-        New Name: {new_name}
-        Reason: {reason}
-        Include standard legal language and formatting."""
-        order_preview = get_ai_response(order_prompt, client)
-        if order_preview:
-            st.markdown(f"""
-            <div style="border: 1px solid #ccc; padding: 20px; border-radius: 5px; background-color: #f9f9f9;">
-                {order_preview}
-            </div>
-            """, unsafe_allow_html=True)
+        loader.add(get_court_order_preview, state, reason, current_name, new_name, render=_render_document)
     
     # Form Completion Instructions
     st.subheader("Form Completion Instructions")
-    instructions = get_form_instructions(state, reason, client)
-    if instructions:
-        st.markdown(instructions)
+    loader.add(get_form_instructions, state, reason)
     
     # Filing Instructions
     st.subheader("Filing Instructions")
-    filing = get_filing_instructions(state, reason, client)
-    if filing:
-        st.markdown(filing)
+    loader.add(get_filing_instructions, state, reason)
     
     # Interactive Help
     st.subheader("Need Help with Forms?")
     form_question = st.text_input("Ask a question about form completion or filing:")
     if form_question:
-        help_prompt = f"Answer this question about name change forms in {state} for {reason}: {form_question}"
-        help_response = get_ai_response(help_prompt, client)
-        if help_response:
-            st.markdown(f"""
-            <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px; margin-top: 10px;">
-                {help_response}
-            </div>
-            """, unsafe_allow_html=True)
+        loader.add(get_form_help, state, reason, form_question, render=render_answer_box, interactive=True)
     
     # Document Checklist
     st.subheader("Final Checklist")
-    checklist_prompt = f"""Create a final checklist for name change document preparation in {state} for {reason}.
-    Include all forms, supporting documents, copies needed, and filing requirements."""
-    checklist = get_ai_response(checklist_prompt, client)
-    if checklist:
-        st.markdown(f"""
-        <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin-top: 20px;">
-            <h4>Document Preparation Checklist</h4>
-            {checklist}
-        </div>
-        """, unsafe_allow_html=True)
+    loader.add(get_final_checklist, state, reason, render=_render_checklist)
     
     # Resources
     st.markdown("---")
     st.subheader("Additional Resources")
-    resources_prompt = f"Provide 3-4 official resources for name change form preparation in {state}, particularly for {reason}."
-    resources = get_ai_response(resources_prompt, client)
-    if resources:
-        st.markdown(resources) 
\ No newline at end of file
+    loader.add(get_form_resources, state, reason)
+    
+    # Every section above is already generating; paint each as it arrives
+    loader.wait()
+
+def _render_document(placeholder, content):
+    placeholder.markdown(f"""
+    <div style="border: 1px solid #ccc; padding: 20px; border-radius: 5px; background-color: #f9f9f9;">
+        {content}
+    </div>
+    """, unsafe_allow_html=True)
+
+def _render_checklist(placeholder, content):
+    placeholder.markdown(f"""
+    <div style="background-color: #f5f5f5; padding: 20px; border-radius: 10px; margin-top: 20px;">
+        <h4>Document Preparation Checklist</h4>
+        {content}
+    </div>
+    """, unsafe_allow_html=True)
@@ -1,38 +1,17 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
+from streamlit.errors import StreamlitAPIException
+from modules import session_memo
+from modules.section_loader import prefetch
+from modules.llm_gateway import (
+    BALANCED, PREFETCH, ask, ask_stream, config, get_ai_client, submit_with_priority
+)
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
-
-def get_ai_response(prompt, client):
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": """You are an intake specialist focusing on name change processes.
+SYSTEM_PROMPT = """You are an intake specialist focusing on name change processes.
                 Provide personalized guidance and validation for name change information.
                 Be empathetic and supportive while ensuring accuracy and completeness.
-                Help users understand why each piece of information is important."""},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=500
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating response: {str(e)}")
-        return None
+                Help users understand why each piece of information is important."""
 
-def validate_name(name, reason, client):
+def validate_name(name, reason):
     prompt = f"""Validate this name change request:
     Current Name: {name}
     Reason: {reason}
@@ -42,9 +21,9 @@ def validate_name(name, reason, client):
     3. Special considerations for {reason}
     4. Potential issues to address
     Provide feedback in a supportive way."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
 
-def get_next_steps(answers, client):
+def get_next_steps(answers):
     prompt = f"""Based on these intake answers, suggest next steps:
     {answers}
     Include:
@@ -53,9 +32,9 @@ def get_next_steps(answers, client):
     3. Potential challenges
     4. Helpful resources
     5. Timeline expectations"""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, report_errors=True)
 
-def get_personalized_guidance(question, previous_answers, client):
+def get_personalized_guidance(question, previous_answers, stream=False):
     prompt = f"""Provide personalized guidance for this intake question:
     Question: {question}
     Previous Answers: {previous_answers}
@@ -64,7 +43,64 @@ def get_personalized_guidance(question, previous_answers, client):
     2. Things to consider
     3. Examples if helpful
     4. Common pitfalls to avoid"""
-    return get_ai_response(prompt, client)
+    if stream:
+        # Render the reply token by token and return the full text
+        return st.write_stream(
+            ask_stream(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
+        )
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
+
+# Seconds to wait for prefetched guidance that is already being generated
+GUIDANCE_PREFETCH_WAIT = 5.0
+
+# Answers that shape the guidance for later questions. Names are left out, so
+# guidance prefetched while a name is being typed stays valid once it is sent.
+GUIDANCE_CONTEXT = ("reason", "state", "voting_concerns")
+
+def guidance_context(answers):
+    """The part of the intake answers the guidance prompt depends on"""
+    return {key: answers[key] for key in GUIDANCE_CONTEXT if answers.get(key)}
+
+def _prefetch_guidance(question, context):
+    """Start generating guidance for question in the background unless it is already under way"""
+    prefetched = st.session_state.setdefault("guidance_prefetch", {})
+    key = session_memo.fingerprint(question["id"], context)
+    if key not in prefetched:
+        # Only a guess, so it must not hold up questions users actually asked
+        # or the sections of pages they are looking at
+        prefetched[key] = submit_with_priority(
+            PREFETCH, get_personalized_guidance, question["question"], context
+        )
+
+def _take_prefetched_guidance(question, context):
+    """Return guidance prefetched for exactly this context, or None if it has to be generated now"""
+    prefetched = st.session_state.get("guidance_prefetch", {})
+    future = prefetched.pop(session_memo.fingerprint(question["id"], context), None)
+    _cancel_prefetched_guidance()
+    # A prefetch still queued behind other work would take longer than
+    # streaming the guidance live, so drop it
+    if future is None or future.cancel():
+        return None
+    try:
+        if not future.done():
+            with st.spinner("Thinking..."):
+                guidance, _ = future.result(timeout=GUIDANCE_PREFETCH_WAIT)
+        else:
+            guidance, _ = future.result()
+    except Exception:
+        # Timed out or failed; errors surface when it is generated live
+        return None
+    return guidance
+
+def _cancel_prefetched_guidance():
+    """Drop guidance prefetched for answers that were not given"""
+    for future in st.session_state.pop("guidance_prefetch", {}).values():
+        future.cancel()
+
+def _is_asked(question, answers):
+    """Whether a question applies given the answers so far"""
+    condition = question.get("conditional")
+    return not condition or answers.get(condition["id"]) == condition["value"]
 
 # Define questions to ask during intake
 INTAKE_QUESTIONS = [
@@ -152,14 +188,13 @@ def render_intake_form():
         client = get_ai_client()
         if client and st.button("Get Personalized Guidance"):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant providing guidance for name changes."},
-                        {"role": "user", "content": f"Based on these details:\n- Current name: {st.session_state.intake_answers['current_name']}\n- New name: {st.session_state.intake_answers['new_name']}\n- Reason: {st.session_state.intake_answers['reason']}\n- State: {st.session_state.intake_answers['state']}\nWhat should they know about the name change process?"}
-                    ]
+                answer = ask(
+                    "You are a helpful assistant providing guidance for name changes.",
+                    f"Based on these details:\n- Current name: {st.session_state.intake_answers['current_name']}\n- New name: {st.session_state.intake_answers['new_name']}\n- Reason: {st.session_state.intake_answers['reason']}\n- State: {st.session_state.intake_answers['state']}\nWhat should they know about the name change process?",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("Guidance:", response.choices[0].message.content)
+                st.write("Guidance:", answer)
             except Exception as e:
                 st.error(f"Error getting guidance: {str(e)}")
 
@@ -171,9 +206,53 @@ def render_intake_form():
 
         st.success("✅ Intake form completed! You can now explore other sections for detailed guidance.")
 
-    # Initialize OpenAI client only when needed
-    client = None
-    
+    _render_chat()
+
+def _prefetch_downstream_sections(answers):
+    """Generate the state and reason sections of the pages opened after intake in the background"""
+    from modules import form_preview, legal_info, voting_rights
+
+    state = answers.get("state")
+    reason = answers.get("reason")
+    if not (state and reason):
+        return
+    current_name = answers.get("current_name")
+    new_name = answers.get("new_name")
+
+    sections = [
+        (voting_rights.get_state_voting_info, state, reason),
+        (voting_rights.get_voting_checklist, state, reason),
+        (voting_rights.get_voting_faqs, state, reason),
+        (voting_rights.get_voting_resources, state),
+        (form_preview.get_form_requirements, state, reason),
+        (form_preview.get_form_instructions, state, reason),
+        (form_preview.get_filing_instructions, state, reason),
+        (form_preview.get_final_checklist, state, reason),
+        (form_preview.get_form_resources, state, reason),
+    ]
+    if current_name and new_name:
+        sections += [
+            (form_preview.get_petition_preview, state, reason, current_name, new_name),
+            (form_preview.get_court_order_preview, state, reason, current_name, new_name),
+        ]
+    for fn, *args in sections:
+        prefetch(fn, *args)
+    # Legal Information memoizes its resources itself rather than through a
+    # SectionLoader, so only warm the response cache for it
+    if st.session_state.get("legal_resources_warmed") != state:
+        st.session_state.legal_resources_warmed = state
+        submit_with_priority(PREFETCH, legal_info.get_legal_resources, state)
+
+def _rerun_chat():
+    """Rerun only the chat fragment, or the whole page when the chat was drawn by a full-page run"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment
+def _render_chat():
+    """Chat-style intake; answering a question reruns only this fragment, not the whole page"""
     # Display chat history
     for message in st.session_state.chat_history:
         if message["role"] == "assistant":
@@ -190,12 +269,12 @@ def render_intake_form():
     if current_index >= len(INTAKE_QUESTIONS):
         st.success("✅ Information Collection Complete!")
         
-        # Initialize OpenAI client only when generating summary
-        if client is None:
-            client = get_ai_client()
+        # Users usually open the guidance pages next; start their sections now
+        _prefetch_downstream_sections(st.session_state.intake_answers)
         
-        # Get AI-generated summary and next steps
-        summary = get_next_steps(st.session_state.intake_answers, client)
+        # Get AI-generated summary and next steps, generated once per set of answers
+        answers = st.session_state.intake_answers
+        summary = session_memo.memoize("intake.next_steps", [answers], lambda: get_next_steps(answers))
         if summary:
             st.markdown("""
             <div style="background-color: #f0f7ff; padding: 20px; border-radius: 10px; margin: 20px 0;">
@@ -223,12 +302,10 @@ def render_intake_form():
         
         # Validation of name change
         if 'new_name' in st.session_state.intake_answers and 'reason' in st.session_state.intake_answers:
-            if client is None:
-                client = get_ai_client()
-            validation = validate_name(
-                st.session_state.intake_answers['new_name'],
-                st.session_state.intake_answers['reason'],
-                client
+            new_name = st.session_state.intake_answers['new_name']
+            reason = st.session_state.intake_answers['reason']
+            validation = session_memo.memoize(
+                "intake.validation", [new_name, reason], lambda: validate_name(new_name, reason)
             )
             if validation:
                 st.markdown("""
@@ -242,7 +319,9 @@ def render_intake_form():
         if st.button("Start Over", key="start_over_btn"):
             st.session_state.current_question_index = 0
             st.session_state.intake_answers = {}
-            st.session_state.chat_history = []
+            st.session_state.chat_history.clear()
+            _cancel_prefetched_guidance()
+            # The intake form above shows the answers too, so rerun the whole page
             st.rerun()
             
         return
@@ -251,11 +330,9 @@ def render_intake_form():
     current_q = INTAKE_QUESTIONS[current_index]
     
     # Check if this question should be skipped based on conditional logic
-    if "conditional" in current_q:
-        condition = current_q["conditional"]
-        if st.session_state.intake_answers.get(condition["id"]) != condition["value"]:
-            st.session_state.current_question_index += 1
-            st.rerun()
+    if not _is_asked(current_q, st.session_state.intake_answers):
+        st.session_state.current_question_index += 1
+        _rerun_chat()
     
     # Display current question without AI guidance initially
     with st.chat_message("assistant", avatar="👨‍⚖️"):
@@ -296,6 +373,18 @@ def render_intake_form():
         if st.button("Submit", key=f"submit_{current_q['id']}"):
             user_input = temp_input
     
+    # Speculatively start the next question's guidance, assuming the option
+    # currently selected here is the one that will be submitted. Sessions that
+    # merely landed on this page have not started the intake yet, so wait for
+    # the first answer.
+    if not user_input and current_index > 0 and current_index + 1 < len(INTAKE_QUESTIONS):
+        speculative_answers = dict(st.session_state.intake_answers)
+        if current_q["type"] in ("select", "radio"):
+            speculative_answers[current_q["id"]] = temp_input
+        next_q = INTAKE_QUESTIONS[current_index + 1]
+        if _is_asked(next_q, speculative_answers):
+            _prefetch_guidance(next_q, guidance_context(speculative_answers))
+    
     # Process user input
     if user_input:
         # Add user response to chat history
@@ -307,27 +396,31 @@ def render_intake_form():
         # Store answer in session state
         st.session_state.intake_answers[current_q["id"]] = user_input
         
-        # Initialize OpenAI client only after user input
-        if client is None:
-            client = get_ai_client()
-        
-        # Get AI guidance for next question
+        # Get AI guidance for next question; it was usually prefetched while
+        # this question was on screen, otherwise stream it as it is generated.
+        # A question that will be skipped gets no guidance.
         next_index = current_index + 1
-        if next_index < len(INTAKE_QUESTIONS):
+        if next_index < len(INTAKE_QUESTIONS) and _is_asked(INTAKE_QUESTIONS[next_index], st.session_state.intake_answers):
             next_q = INTAKE_QUESTIONS[next_index]
-            guidance = get_personalized_guidance(
-                next_q["question"],
-                st.session_state.intake_answers,
-                client
-            )
+            context = guidance_context(st.session_state.intake_answers)
+            with st.chat_message("user", avatar="👤"):
+                st.write(user_input)
+            with st.chat_message("assistant", avatar="👨‍⚖️"):
+                guidance = _take_prefetched_guidance(next_q, context)
+                if guidance:
+                    st.write(guidance)
+                else:
+                    guidance = get_personalized_guidance(next_q["question"], context, stream=True)
             if guidance:
                 st.session_state.chat_history.append({
                     "role": "assistant",
                     "content": guidance
                 })
+        else:
+            _cancel_prefetched_guidance()
         
         # Move to next question
         st.session_state.current_question_index += 1
         
-        # Rerun to update UI
-        st.rerun() 
\ No newline at end of file
+        # Rerun to update the chat
+        _rerun_chat()
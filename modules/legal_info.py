@@ -1,38 +1,15 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
+from modules import session_memo
+from modules.content_pack import pack_section
+from modules.llm_gateway import BALANCED, ask, ask_stream, get_ai_client
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
-
-def get_ai_response(prompt, client):
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": """You are a legal information assistant specializing in name change processes.
+SYSTEM_PROMPT = """You are a legal information assistant specializing in name change processes.
                 Provide accurate, up-to-date information about legal name change procedures.
                 Always include appropriate disclaimers about not being legal advice.
-                Focus on general procedures and requirements while encouraging users to verify with local courts."""},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating response: {str(e)}")
-        return None
+                Focus on general procedures and requirements while encouraging users to verify with local courts."""
 
-def get_state_requirements(state, reason, client):
+@pack_section
+def get_state_requirements(state, reason):
     prompt = f"""Provide detailed information about name change requirements in {state}, specifically for someone changing their name due to {reason}.
     Include:
     1. Required court filings
@@ -41,9 +18,10 @@ def get_state_requirements(state, reason, client):
     4. Estimated timeframe
     5. Special considerations for {reason}
     Remember to note this is general information and may vary by county."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_process_steps(state, reason, client):
+@pack_section
+def get_process_steps(state, reason):
     prompt = f"""List the step-by-step process for changing one's name in {state}, specifically for {reason}.
     Include:
     1. Initial preparation steps
@@ -52,9 +30,10 @@ def get_process_steps(state, reason, client):
     4. Court hearing details (if applicable)
     5. Post-approval steps
     Make it clear these are general guidelines and actual steps may vary."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_document_checklist(state, reason, client):
+@pack_section
+def get_document_checklist(state, reason):
     prompt = f"""Create a checklist of required documents for a name change in {state} due to {reason}.
     Include:
     1. Court forms
@@ -62,7 +41,12 @@ def get_document_checklist(state, reason, client):
     3. Supporting documentation specific to {reason}
     4. Additional requirements that may apply
     Note that requirements may vary by county."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+@pack_section
+def get_legal_resources(state):
+    prompt = f"Provide 3-4 relevant official resources (with URLs) for name changes in {state}."
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
 def render_legal_info():
     st.header("Legal Information")
@@ -78,14 +62,13 @@ def render_legal_info():
         client = get_ai_client()
         if client and st.button("Get State Requirements"):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant providing legal information about name change processes."},
-                        {"role": "user", "content": f"What are the legal requirements and procedures for changing your name in {state}?"}
-                    ]
+                answer = ask(
+                    "You are a helpful assistant providing legal information about name change processes.",
+                    f"What are the legal requirements and procedures for changing your name in {state}?",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("State Requirements:", response.choices[0].message.content)
+                st.write("State Requirements:", answer)
             except Exception as e:
                 st.error(f"Error getting requirements: {str(e)}")
 
@@ -104,14 +87,13 @@ def render_legal_info():
         client = get_ai_client()
         if client:
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant providing general legal information about name changes. Always remind users to consult with legal professionals for specific advice."},
-                        {"role": "user", "content": user_question}
-                    ]
-                )
-                st.write("Answer:", response.choices[0].message.content)
+                st.write("Answer:")
+                session_memo.memoize_stream("legal_info.answer", [user_question], lambda: ask_stream(
+                    "You are a helpful assistant providing general legal information about name changes. Always remind users to consult with legal professionals for specific advice.",
+                    user_question,
+                    tier=BALANCED,
+                    client=client
+                ))
             except Exception as e:
                 st.error(f"Error getting answer: {str(e)}")
 
@@ -128,8 +110,7 @@ def render_legal_info():
     
     # Generate relevant resources based on user's situation
     if state:
-        resources_prompt = f"Provide 3-4 relevant official resources (with URLs) for name changes in {state}."
-        resources = get_ai_response(resources_prompt, client)
+        resources = session_memo.memoize("legal_info.resources", [state], lambda: get_legal_resources(state))
         if resources:
             st.markdown(resources)
     else:
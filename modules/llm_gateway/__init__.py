@@ -0,0 +1,47 @@
+"""Shared entry point for every OpenAI call the page modules make"""
+from modules.llm_gateway.cache import ResponseCache, response_cache
+from modules.llm_gateway.client import get_ai_client, get_shared_client
+from modules.llm_gateway.concurrency import pending_tasks, submit, submit_with_priority
+from modules.llm_gateway.disk_cache import DiskCache, disk_cache
+from modules.llm_gateway.errors import capture_errors, report_error
+from modules.llm_gateway.gateway import ask, ask_stream, chat_completion, stream_chat_completion
+from modules.llm_gateway.metrics import CallMetrics, call_metrics, percentile, start_metrics_server
+from modules.llm_gateway.routing import BALANCED, FAST, POLICY, QUALITY
+from modules.llm_gateway.scheduler import (
+    BACKGROUND, INTERACTIVE, PREFETCH, RateLimitScheduler, priority, request_scheduler
+)
+from modules.llm_gateway.singleflight import SingleFlight, completions_in_flight
+
+__all__ = [
+    "BACKGROUND",
+    "BALANCED",
+    "CallMetrics",
+    "DiskCache",
+    "FAST",
+    "INTERACTIVE",
+    "POLICY",
+    "PREFETCH",
+    "QUALITY",
+    "RateLimitScheduler",
+    "ResponseCache",
+    "SingleFlight",
+    "ask",
+    "ask_stream",
+    "call_metrics",
+    "capture_errors",
+    "chat_completion",
+    "completions_in_flight",
+    "disk_cache",
+    "get_ai_client",
+    "get_shared_client",
+    "pending_tasks",
+    "percentile",
+    "priority",
+    "report_error",
+    "request_scheduler",
+    "response_cache",
+    "start_metrics_server",
+    "stream_chat_completion",
+    "submit",
+    "submit_with_priority",
+]
@@ -0,0 +1,51 @@
+import os
+import threading
+
+import httpx
+from openai import DefaultHttpxClient, OpenAI
+
+from modules.llm_gateway import config
+from modules.llm_gateway.errors import report_error
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_client(api_key):
+    """Create an OpenAI client backed by a keep-alive connection pool"""
+    http_client = DefaultHttpxClient(
+        limits=httpx.Limits(
+            max_connections=config.POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.POOL_MAX_KEEPALIVE,
+            keepalive_expiry=config.POOL_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(config.REQUEST_TIMEOUT, connect=config.CONNECT_TIMEOUT),
+    )
+    return OpenAI(
+        api_key=api_key,
+        base_url=config.OPENAI_BASE_URL,
+        # Retries are handled by the gateway scheduler with jittered backoff
+        max_retries=0,
+        http_client=http_client,
+    )
+
+
+def get_shared_client():
+    """Return the process-wide OpenAI client, or None if no API key is configured"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("OPENAI_API_KEY")
+                if not api_key:
+                    return None
+                _client = _build_client(api_key)
+    return _client
+
+
+def get_ai_client():
+    """Return the shared OpenAI client, reporting a missing API key in the UI"""
+    client = get_shared_client()
+    if client is None:
+        report_error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
+    return client
@@ -0,0 +1,106 @@
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+
+from modules.llm_gateway import config
+from modules.llm_gateway.errors import capture_errors
+from modules.llm_gateway.scheduler import BACKGROUND, priority
+
+
+class PriorityExecutor:
+    """Fixed pool of worker threads that starts queued tasks by priority, then arrival.
+
+    Unlike ThreadPoolExecutor's first-in, first-out queue, a question a user
+    just typed starts on the next free worker even when every session's
+    section fills and prefetches were queued before it, and a section on
+    screen starts ahead of queued prefetches.
+    """
+
+    def __init__(self, max_workers, thread_name_prefix):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = []
+        # Released by a worker each time it finishes a task, as in ThreadPoolExecutor
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+
+    def submit(self, level, fn, *args, **kwargs):
+        future = Future()
+        self._queue.put((level, next(self._sequence), future, fn, args, kwargs))
+        if self._idle.acquire(timeout=0):
+            return future
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self.thread_name_prefix}_{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+        return future
+
+    def _work(self):
+        while True:
+            _, _, future, fn, args, kwargs = self._queue.get()
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            self._idle.release()
+
+
+# One bounded pool for the whole process so concurrent sessions cannot open
+# an unbounded number of simultaneous API calls
+_executor = PriorityExecutor(
+    max_workers=config.FANOUT_MAX_WORKERS,
+    thread_name_prefix="llm-fanout",
+)
+
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+def _run_captured(level, fn, args, kwargs):
+    with priority(level), capture_errors() as errors:
+        result = fn(*args, **kwargs)
+    return result, errors
+
+
+def submit_with_priority(level, fn, *args, **kwargs):
+    """Run fn on the shared pool with its API calls scheduled at the given priority.
+
+    Interactive tasks start before queued background ones, and background
+    tasks before queued prefetches. The returned
+    future resolves to (result, errors) where errors lists any messages fn
+    reported through report_error().
+    """
+    global _pending
+    with _pending_lock:
+        _pending += 1
+    future = _executor.submit(level, _run_captured, level, fn, args, kwargs)
+    future.add_done_callback(_task_done)
+    return future
+
+
+def _task_done(future):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+def pending_tasks():
+    """Tasks submitted to the shared pool that have not finished yet"""
+    with _pending_lock:
+        return _pending
+
+
+def submit(fn, *args, **kwargs):
+    """Run fn on the shared pool as a background task; see submit_with_priority()"""
+    return submit_with_priority(BACKGROUND, fn, *args, **kwargs)
@@ -0,0 +1,96 @@
+import os
+from dotenv import load_dotenv
+
+# Environment is loaded once per process here instead of in every page module
+load_dotenv()
+
+
+def env_int(name, default):
+    """Read an integer setting from the environment, falling back to a default"""
+    value = os.getenv(name)
+    try:
+        return int(value) if value else default
+    except ValueError:
+        return default
+
+
+def env_float(name, default):
+    """Read a float setting from the environment, falling back to a default"""
+    value = os.getenv(name)
+    try:
+        return float(value) if value else default
+    except ValueError:
+        return default
+
+
+# Alternative API endpoint, e.g. the local fake server in modules.fake_openai
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# Connection pool for the shared OpenAI client
+POOL_MAX_CONNECTIONS = env_int("LLM_POOL_MAX_CONNECTIONS", 20)
+POOL_MAX_KEEPALIVE = env_int("LLM_POOL_MAX_KEEPALIVE", 10)
+POOL_KEEPALIVE_EXPIRY = env_float("LLM_POOL_KEEPALIVE_EXPIRY", 60.0)
+
+# Timeouts (seconds) and retries applied to every request
+CONNECT_TIMEOUT = env_float("LLM_CONNECT_TIMEOUT", 5.0)
+REQUEST_TIMEOUT = env_float("LLM_REQUEST_TIMEOUT", 60.0)
+MAX_RETRIES = env_int("LLM_MAX_RETRIES", 2)
+
+# In-memory response cache shared by every session in the process
+CACHE_MAX_ENTRIES = env_int("LLM_CACHE_MAX_ENTRIES", 1024)
+CACHE_TTL_SECONDS = env_float("LLM_CACHE_TTL_SECONDS", 6 * 60 * 60)
+
+# On-disk response cache shared by every worker process on the node.
+# Set LLM_DISK_CACHE_PATH to an empty string to disable it.
+DISK_CACHE_PATH = os.getenv("LLM_DISK_CACHE_PATH", os.path.join(".cache", "llm_responses.sqlite3"))
+DISK_CACHE_MAX_ENTRIES = env_int("LLM_DISK_CACHE_MAX_ENTRIES", 20000)
+DISK_CACHE_TTL_SECONDS = env_float("LLM_DISK_CACHE_TTL_SECONDS", 7 * 24 * 60 * 60)
+
+# Bump whenever prompt templates change so stale answers are never served
+PROMPT_TEMPLATE_VERSION = os.getenv("LLM_PROMPT_TEMPLATE_VERSION", "1")
+
+# Worker threads shared by every page that sends independent prompts at once
+FANOUT_MAX_WORKERS = env_int("LLM_FANOUT_MAX_WORKERS", 16)
+
+# Seconds a page waits for one generated section before showing a timeout notice
+SECTION_TIMEOUT = env_float("LLM_SECTION_TIMEOUT", 45.0)
+
+# Precomputed answers for every (state, reason) section, built offline
+CONTENT_PACK_PATH = os.getenv("CONTENT_PACK_PATH", os.path.join("data", "content_pack.json.gz"))
+
+# Process-wide API budgets enforced before a request is sent
+REQUESTS_PER_MINUTE = env_int("LLM_REQUESTS_PER_MINUTE", 500)
+TOKENS_PER_MINUTE = env_int("LLM_TOKENS_PER_MINUTE", 300000)
+
+# Backoff (seconds) between retries of rate-limited or failed requests
+RETRY_BASE_DELAY = env_float("LLM_RETRY_BASE_DELAY", 1.0)
+RETRY_MAX_DELAY = env_float("LLM_RETRY_MAX_DELAY", 30.0)
+
+# Model, reply budget and timeout for each latency/quality tier (see routing.POLICY)
+MODEL_FAST = os.getenv("LLM_MODEL_FAST", "gpt-3.5-turbo")
+MODEL_BALANCED = os.getenv("LLM_MODEL_BALANCED", "gpt-3.5-turbo")
+MODEL_QUALITY = os.getenv("LLM_MODEL_QUALITY", "gpt-4-turbo-preview")
+MAX_TOKENS_FAST = env_int("LLM_MAX_TOKENS_FAST", 300)
+MAX_TOKENS_BALANCED = env_int("LLM_MAX_TOKENS_BALANCED", 600)
+MAX_TOKENS_QUALITY = env_int("LLM_MAX_TOKENS_QUALITY", 1000)
+TIMEOUT_FAST = env_float("LLM_TIMEOUT_FAST", 15.0)
+TIMEOUT_BALANCED = env_float("LLM_TIMEOUT_BALANCED", 30.0)
+TIMEOUT_QUALITY = env_float("LLM_TIMEOUT_QUALITY", 60.0)
+
+# Per-call instrumentation: JSON log lines, a Prometheus text file and/or endpoint
+METRICS_LOG = env_int("LLM_METRICS_LOG", 0) == 1
+METRICS_FILE = os.getenv("LLM_METRICS_FILE", "")
+METRICS_FILE_INTERVAL = env_float("LLM_METRICS_FILE_INTERVAL", 15.0)
+METRICS_PORT = env_int("LLM_METRICS_PORT", 0)
+METRICS_HOST = os.getenv("LLM_METRICS_HOST", "127.0.0.1")
+METRICS_RECENT_CALLS = env_int("LLM_METRICS_RECENT_CALLS", 1000)
+
+# Per-session conversation memory (see modules.conversation_memory): tokens
+# of recent messages sent verbatim, length of the rolling summary of older
+# turns, and a hard cap on the characters one conversation may hold
+MEMORY_WINDOW_TOKENS = env_int("LLM_MEMORY_WINDOW_TOKENS", 2000)
+MEMORY_SUMMARY_TOKENS = env_int("LLM_MEMORY_SUMMARY_TOKENS", 300)
+MEMORY_MAX_CHARS = env_int("LLM_MEMORY_MAX_CHARS", 32000)
+
+# Password for the operator performance dashboard; the page is hidden when unset
+ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "")
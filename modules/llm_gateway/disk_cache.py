@@ -0,0 +1,152 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from modules.llm_gateway import config
+
+logger = logging.getLogger(__name__)
+
+# Expired and over-cap rows are pruned once every this many writes
+_PRUNE_EVERY = 50
+
+# A hit only refreshes accessed_at when it is older than this, so most reads
+# never take the database write lock; LRU order only needs to be approximate
+_TOUCH_INTERVAL = 60.0
+
+
+class DiskCache:
+    """SQLite-backed completion cache shared by every worker process on the node.
+
+    The database runs in WAL mode so readers in one process never block writers
+    in another. Rows carry the prompt template version they were generated with;
+    rows from any other version are treated as misses and pruned.
+    """
+
+    def __init__(self, path, max_entries, ttl_seconds, version):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version = version
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self):
+        """Return this thread's connection, creating the schema on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        version TEXT NOT NULL,
+                        value TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        accessed_at REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+                conn.commit()
+                self._initialized = True
+        self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return the cached text for key, or None if missing, stale or unreadable"""
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, created_at, accessed_at FROM responses WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at, accessed_at = row
+            now = time.time()
+            if created_at + self.ttl_seconds <= now:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+        except sqlite3.Error as e:
+            logger.warning("Disk cache read failed: %s", e)
+            return None
+
+        if now - accessed_at >= _TOUCH_INTERVAL:
+            try:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+            except sqlite3.Error as e:
+                # The value is still good; only its LRU position is stale
+                logger.warning("Disk cache access time update failed: %s", e)
+        return value
+
+    def set(self, key, value):
+        """Store text under key and periodically prune the table"""
+        if self.max_entries <= 0:
+            return
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, version, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, self.version, value, now, now),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Disk cache write failed: %s", e)
+            return
+
+        with self._writes_lock:
+            self._writes += 1
+            should_prune = self._writes % _PRUNE_EVERY == 1
+        if should_prune:
+            self.prune()
+
+    def prune(self):
+        """Drop expired rows, rows from other template versions and the LRU overflow"""
+        try:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM responses WHERE version != ? OR created_at <= ?",
+                (self.version, time.time() - self.ttl_seconds),
+            )
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Disk cache prune failed: %s", e)
+
+    def clear(self):
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("Disk cache clear failed: %s", e)
+
+
+disk_cache = None
+if config.DISK_CACHE_PATH:
+    disk_cache = DiskCache(
+        config.DISK_CACHE_PATH,
+        config.DISK_CACHE_MAX_ENTRIES,
+        config.DISK_CACHE_TTL_SECONDS,
+        config.PROMPT_TEMPLATE_VERSION,
+    )
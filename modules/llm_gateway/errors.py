@@ -0,0 +1,31 @@
+import threading
+from contextlib import contextmanager
+
+import streamlit as st
+
+_local = threading.local()
+
+
+def report_error(message):
+    """Show an error on the page, or collect it when running off the script thread.
+
+    Worker threads have no Streamlit script context, so errors raised while
+    generating a section in parallel are gathered by capture_errors() and
+    rendered by the page once the section's result is collected.
+    """
+    sink = getattr(_local, "errors", None)
+    if sink is None:
+        st.error(message)
+    else:
+        sink.append(message)
+
+
+@contextmanager
+def capture_errors():
+    """Collect report_error() messages raised in this thread instead of rendering them"""
+    previous = getattr(_local, "errors", None)
+    _local.errors = []
+    try:
+        yield _local.errors
+    finally:
+        _local.errors = previous
@@ -0,0 +1,207 @@
+from modules.llm_gateway.cache import make_cache_key, response_cache
+from modules.llm_gateway.client import get_ai_client
+from modules.llm_gateway.disk_cache import disk_cache
+from modules.llm_gateway.errors import report_error
+from modules.llm_gateway.metrics import CallRecord, find_caller
+from modules.llm_gateway.routing import QUALITY, route
+from modules.llm_gateway.scheduler import call_with_budget, request_scheduler
+from modules.llm_gateway.singleflight import completions_in_flight
+
+
+def _resolve(tier, model, max_tokens):
+    """Fill in whatever the call site left unset from the tier's routing policy"""
+    policy = route(tier)
+    return (
+        model or policy["model"],
+        max_tokens if max_tokens is not None else policy["max_tokens"],
+        policy["timeout"],
+    )
+
+
+def chat_completion(messages, tier=QUALITY, temperature=None, client=None, cache=False, model=None, max_tokens=None,
+                    caller=None):
+    """Send a chat completion through the shared client and return the reply text.
+
+    The model, reply budget and timeout come from the routing policy for the
+    declared tier; model and max_tokens may still be pinned explicitly.
+    With cache=True the reply is served from, and stored in, the process-wide
+    memory cache backed by the on-disk cache shared across workers. Identical
+    requests made concurrently from different sessions share a single API
+    call, and every call waits for the process-wide rate budget. Returns
+    None when no client is available; API errors are raised to the caller.
+
+    Every call is recorded in the call metrics under `caller`, which
+    defaults to the page function found on the stack.
+    """
+    model, max_tokens, timeout = _resolve(tier, model, max_tokens)
+    call = _start_call(caller, model, tier, messages)
+    call.start()
+    key = make_cache_key(model, messages, temperature, max_tokens)
+    try:
+        if cache:
+            cached = response_cache.get(key)
+            if cached is not None:
+                call.cache = "memory"
+                call.finish()
+                return cached
+
+        def complete():
+            if cache and disk_cache is not None:
+                cached = disk_cache.get(key)
+                if cached is not None:
+                    call.cache = "disk"
+                    response_cache.set(key, cached)
+                    return cached
+
+            call.cache = "miss"
+            content = _create_completion(messages, model, temperature, max_tokens, timeout, client, call)
+            if cache and content:
+                response_cache.set(key, content)
+                if disk_cache is not None:
+                    disk_cache.set(key, content)
+            return content
+
+        content = completions_in_flight.do(key, complete)
+    except Exception as e:
+        call.finish(e)
+        raise
+    call.finish()
+    return content
+
+
+def _start_call(caller, model, tier, messages, stream=False):
+    call = CallRecord(caller or find_caller(), model, tier, stream=stream)
+    call.prompt = (messages[-1].get("content") or "") if messages else ""
+    return call
+
+
+def _create_completion(messages, model, temperature, max_tokens, timeout, client, call):
+    if client is None:
+        client = get_ai_client()
+    if client is None:
+        return None
+
+    params = {"max_tokens": max_tokens, "timeout": timeout}
+    if temperature is not None:
+        params["temperature"] = temperature
+
+    response, reservation = call_with_budget(
+        lambda: client.chat.completions.create(model=model, messages=messages, **params),
+        messages,
+        max_tokens,
+    )
+    usage = getattr(response, "usage", None)
+    request_scheduler.reconcile(reservation, usage.total_tokens if usage else None)
+    if usage:
+        call.prompt_tokens = usage.prompt_tokens
+        call.completion_tokens = usage.completion_tokens
+    return response.choices[0].message.content
+
+
+def stream_chat_completion(messages, tier=QUALITY, temperature=None, client=None, model=None, max_tokens=None,
+                           caller=None):
+    """Yield the reply text piece by piece as the model generates it.
+
+    Suitable for st.write_stream(); yields nothing when no client is available
+    and raises API errors to the caller while iterating. Token counts
+    recorded for streamed calls are estimates: about four characters per
+    prompt token and one token per streamed chunk.
+    """
+    model, max_tokens, timeout = _resolve(tier, model, max_tokens)
+    # Resolve the call site now, while the page function is still on the stack
+    call = _start_call(caller, model, tier, messages, stream=True)
+    return _stream(messages, model, temperature, max_tokens, timeout, client, call)
+
+
+def _stream(messages, model, temperature, max_tokens, timeout, client, call):
+    if client is None:
+        client = get_ai_client()
+    if client is None:
+        return
+
+    params = {"max_tokens": max_tokens, "timeout": timeout}
+    if temperature is not None:
+        params["temperature"] = temperature
+
+    call.cache = "miss"
+    call.prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4
+    reservation = None
+    call.start()
+    try:
+        stream, reservation = call_with_budget(
+            lambda: client.chat.completions.create(model=model, messages=messages, stream=True, **params),
+            messages,
+            max_tokens,
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                call.first_token()
+                call.completion_tokens += 1
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        call.finish(e)
+        raise
+    finally:
+        # Also covers a consumer that stops iterating early
+        call.finish()
+        if reservation is not None:
+            request_scheduler.reconcile(reservation, call.prompt_tokens + call.completion_tokens)
+
+
+def ask(system_prompt, prompt, tier=QUALITY, temperature=None, client=None, cache=False, model=None, max_tokens=None,
+        caller=None, report_errors=False):
+    """Send a single system + user prompt pair and return the reply text.
+
+    With report_errors=True an API error is shown through report_error() and
+    None is returned, as page sections expect, instead of being raised.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    try:
+        return chat_completion(
+            messages,
+            tier=tier,
+            temperature=temperature,
+            client=client,
+            cache=cache,
+            model=model,
+            max_tokens=max_tokens,
+            caller=caller,
+        )
+    except Exception as e:
+        if not report_errors:
+            raise
+        report_error(f"Error generating response: {str(e)}")
+        return None
+
+
+def ask_stream(system_prompt, prompt, tier=QUALITY, temperature=None, client=None, model=None, max_tokens=None,
+               caller=None, report_errors=False):
+    """Stream the reply to a single system + user prompt pair.
+
+    With report_errors=True an API error ends the stream and is shown through
+    report_error() instead of being raised while iterating.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    stream = stream_chat_completion(
+        messages,
+        tier=tier,
+        temperature=temperature,
+        client=client,
+        model=model,
+        max_tokens=max_tokens,
+        caller=caller,
+    )
+    return _reporting_errors(stream) if report_errors else stream
+
+
+def _reporting_errors(stream):
+    try:
+        yield from stream
+    except Exception as e:
+        report_error(f"Error generating response: {str(e)}")
@@ -0,0 +1,305 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from modules.llm_gateway import config
+
+logger = logging.getLogger(__name__)
+
+# One JSON line per completion on stderr when LLM_METRICS_LOG is enabled
+call_logger = logging.getLogger("llm_gateway.calls")
+if config.METRICS_LOG and not call_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    call_logger.addHandler(_handler)
+    call_logger.setLevel(logging.INFO)
+    call_logger.propagate = False
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0)
+
+# USD per 1K prompt / completion tokens, used for the cost estimate only
+MODEL_PRICES = {
+    "gpt-4-turbo-preview": (0.01, 0.03),
+    "gpt-4-turbo": (0.01, 0.03),
+    "gpt-4o": (0.005, 0.015),
+    "gpt-4o-mini": (0.00015, 0.0006),
+    "gpt-3.5-turbo": (0.0005, 0.0015),
+}
+
+# Frames from these modules and helpers are plumbing, not the call site
+_PLUMBING_MODULES = ("modules.llm_gateway", "modules.session_memo", "modules.section_loader", "modules.content_pack")
+_PLUMBING_FUNCTIONS = {"<lambda>", "<genexpr>", "wrapper"}
+
+
+def find_caller():
+    """Name the page-level function that asked for a completion, e.g. 'voting_rights.get_voting_faqs'"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        name = frame.f_code.co_name
+        if module.startswith("modules.") and not module.startswith(_PLUMBING_MODULES) and name not in _PLUMBING_FUNCTIONS:
+            return f"{module[len('modules.'):]}.{name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    return ((prompt_tokens or 0) * prompt_price + (completion_tokens or 0) * completion_price) / 1000
+
+
+class CallRecord:
+    """Timing and outcome of one completion request, filled in as the call progresses.
+
+    cache is 'memory' or 'disk' for cache hits, 'coalesced' when the reply
+    was shared from an identical in-flight request and 'miss' when the API
+    was called.
+    """
+
+    def __init__(self, caller, model, tier, stream=False):
+        self.caller = caller
+        self.model = model
+        self.tier = tier
+        self.stream = stream
+        self.cache = "coalesced"
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.error = None
+        self.ttft = None
+        self.latency = None
+        # Kept in memory for the slowest-prompt view only, never logged
+        self.prompt = ""
+        self.timestamp = time.time()
+        self._started = time.monotonic()
+
+    def start(self):
+        """Start the clock; the call counts as in flight until finish()"""
+        self.timestamp = time.time()
+        self._started = time.monotonic()
+        call_metrics.call_started()
+
+    def first_token(self):
+        if self.ttft is None:
+            self.ttft = time.monotonic() - self._started
+
+    def finish(self, error=None):
+        """Stop the clock and hand the record to the registry"""
+        if self.latency is not None:
+            return
+        self.latency = time.monotonic() - self._started
+        if error is not None:
+            self.error = type(error).__name__
+        call_metrics.record(self)
+
+    @property
+    def cost(self):
+        return estimate_cost(self.model, self.prompt_tokens, self.completion_tokens)
+
+    def as_dict(self):
+        return {
+            "timestamp": round(self.timestamp, 3),
+            "caller": self.caller,
+            "model": self.model,
+            "tier": self.tier,
+            "stream": self.stream,
+            "cache": self.cache,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "ttft_ms": round(self.ttft * 1000, 1) if self.ttft is not None else None,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost, 6),
+            "error": self.error,
+        }
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+
+
+class CallMetrics:
+    """Process-wide aggregates of every completion, plus a window of recent calls"""
+
+    def __init__(self, recent=1000):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self._calls = {}
+        self._tokens = {}
+        self._cost = {}
+        self._latency = {}
+        self._ttft = {}
+        self._in_flight = 0
+        self._last_export = 0.0
+
+    def call_started(self):
+        with self._lock:
+            self._in_flight += 1
+
+    def in_flight(self):
+        """Calls started and not finished yet, including those waiting for rate budget or a coalesced reply"""
+        with self._lock:
+            return self._in_flight
+
+    def record(self, call):
+        with self._lock:
+            self._in_flight -= 1
+            self._recent.append(call)
+            labels = (call.caller, call.model, call.cache, call.error or "")
+            self._calls[labels] = self._calls.get(labels, 0) + 1
+            for kind, count in (("prompt", call.prompt_tokens), ("completion", call.completion_tokens)):
+                if count:
+                    key = (call.caller, call.model, kind)
+                    self._tokens[key] = self._tokens.get(key, 0) + count
+            if call.cost:
+                key = (call.caller, call.model)
+                self._cost[key] = self._cost.get(key, 0.0) + call.cost
+            self._latency.setdefault(call.caller, _Histogram()).observe(call.latency)
+            if call.ttft is not None:
+                self._ttft.setdefault(call.caller, _Histogram()).observe(call.ttft)
+            export_due = config.METRICS_FILE and time.monotonic() - self._last_export >= config.METRICS_FILE_INTERVAL
+            if export_due:
+                self._last_export = time.monotonic()
+
+        if config.METRICS_LOG:
+            call_logger.info(json.dumps(call.as_dict()))
+        if export_due:
+            self.write_file(config.METRICS_FILE)
+
+    def recent(self, since=None):
+        """Calls still held in the recent window, oldest first, optionally only those after a timestamp"""
+        with self._lock:
+            calls = list(self._recent)
+        if since is not None:
+            calls = [call for call in calls if call.timestamp >= since]
+        return calls
+
+    def render_prometheus(self):
+        """Format the aggregates in the Prometheus text exposition format"""
+        with self._lock:
+            calls = dict(self._calls)
+            tokens = dict(self._tokens)
+            cost = dict(self._cost)
+            latency = {caller: (list(h.buckets), h.count, h.total) for caller, h in self._latency.items()}
+            ttft = {caller: (list(h.buckets), h.count, h.total) for caller, h in self._ttft.items()}
+
+        lines = [
+            "# HELP llm_calls_total Completion requests by call site, model, cache outcome and error class.",
+            "# TYPE llm_calls_total counter",
+        ]
+        for (caller, model, cache, error), count in sorted(calls.items()):
+            lines.append(f"llm_calls_total{_labels(caller=caller, model=model, cache=cache, error=error)} {count}")
+
+        lines += [
+            "# HELP llm_tokens_total Tokens sent and generated by call site and model.",
+            "# TYPE llm_tokens_total counter",
+        ]
+        for (caller, model, kind), count in sorted(tokens.items()):
+            lines.append(f"llm_tokens_total{_labels(caller=caller, model=model, kind=kind)} {count}")
+
+        lines += [
+            "# HELP llm_cost_usd_total Estimated spend by call site and model.",
+            "# TYPE llm_cost_usd_total counter",
+        ]
+        for (caller, model), value in sorted(cost.items()):
+            lines.append(f"llm_cost_usd_total{_labels(caller=caller, model=model)} {value:.6f}")
+
+        for name, help_text, histograms in (
+            ("llm_call_latency_seconds", "Wall time of completion calls, including cache hits.", latency),
+            ("llm_time_to_first_token_seconds", "Time until a streamed reply produced its first token.", ttft),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for caller, (buckets, count, total) in sorted(histograms.items()):
+                for bound, value in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f"{name}_bucket{_labels(caller=caller, le=f'{bound:g}')} {value}")
+                lines.append(f"{name}_bucket{_labels(caller=caller, le='+Inf')} {count}")
+                lines.append(f"{name}_sum{_labels(caller=caller)} {total:.6f}")
+                lines.append(f"{name}_count{_labels(caller=caller)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write_file(self, path):
+        """Write the Prometheus text atomically, e.g. for node_exporter's textfile collector"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write LLM metrics to %s: %s", path, e)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = call_metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host=None):
+    """Serve /metrics on a background thread once per process; returns False if the port is taken"""
+    global _server
+    port = config.METRICS_PORT if port is None else port
+    host = config.METRICS_HOST if host is None else host
+    with _server_lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # Another worker on the node already serves the endpoint
+            logger.warning("Could not serve LLM metrics on %s:%s: %s", host, port, e)
+            return False
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name="llm-metrics", daemon=True).start()
+        return True
+
+
+call_metrics = CallMetrics(recent=config.METRICS_RECENT_CALLS)
+
+if config.METRICS_PORT:
+    start_metrics_server()
@@ -0,0 +1,33 @@
+from modules.llm_gateway import config
+
+# Latency/quality tiers a call site declares instead of naming a model
+FAST = "fast"          # short, high-volume replies such as affirmations and celebrations
+BALANCED = "balanced"  # conversational answers to free-form questions
+QUALITY = "quality"    # detailed legal and procedural sections, mostly cached
+
+# Central routing policy: retuning a tier here moves every call site that declares it
+POLICY = {
+    FAST: {
+        "model": config.MODEL_FAST,
+        "max_tokens": config.MAX_TOKENS_FAST,
+        "timeout": config.TIMEOUT_FAST,
+    },
+    BALANCED: {
+        "model": config.MODEL_BALANCED,
+        "max_tokens": config.MAX_TOKENS_BALANCED,
+        "timeout": config.TIMEOUT_BALANCED,
+    },
+    QUALITY: {
+        "model": config.MODEL_QUALITY,
+        "max_tokens": config.MAX_TOKENS_QUALITY,
+        "timeout": config.TIMEOUT_QUALITY,
+    },
+}
+
+
+def route(tier):
+    """Return the model, max_tokens and timeout the policy assigns to a tier"""
+    try:
+        return POLICY[tier]
+    except KeyError:
+        raise ValueError(f"Unknown model tier {tier!r}, expected one of {sorted(POLICY)}") from None
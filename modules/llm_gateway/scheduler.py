@@ -0,0 +1,166 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from modules.llm_gateway import config
+
+# Lower values are admitted first: questions a user just asked, then the
+# sections of the page on screen, then guesses at what a user will open next
+INTERACTIVE = 0
+BACKGROUND = 1
+PREFETCH = 2
+
+_WINDOW_SECONDS = 60.0
+
+_local = threading.local()
+
+
+def current_priority():
+    """Priority of calls made from this thread; the script thread is interactive"""
+    return getattr(_local, "priority", INTERACTIVE)
+
+
+@contextmanager
+def priority(level):
+    """Run the calls made inside the block at the given priority"""
+    previous = current_priority()
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def estimate_tokens(messages, max_tokens):
+    """Rough token cost of a request: ~4 characters per prompt token plus the reply budget"""
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return prompt_chars // 4 + (max_tokens or 1000)
+
+
+class RateLimitScheduler:
+    """Admit requests under per-minute request and token budgets.
+
+    Waiting requests are ordered by priority, then arrival, so interactive
+    questions overtake queued background section fills, and both overtake
+    prefetches. Budgets are tracked over a sliding 60 second window.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._cond = threading.Condition()
+        self._window = deque()
+        self._window_tokens = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+
+    def _expire(self, now):
+        while self._window and self._window[0][0] <= now - _WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens[0]
+
+    def _delay_for(self, tokens, now):
+        """Seconds until a request of this size fits both budgets"""
+        self._expire(now)
+        if not self._window:
+            return 0.0
+        delay = 0.0
+        if self.requests_per_minute > 0 and len(self._window) >= self.requests_per_minute:
+            delay = self._window[0][0] + _WINDOW_SECONDS - now
+        if self.tokens_per_minute > 0 and self._window_tokens + tokens > self.tokens_per_minute:
+            freed = self._window_tokens + tokens - self.tokens_per_minute
+            for timestamp, entry_tokens in self._window:
+                freed -= entry_tokens[0]
+                if freed <= 0:
+                    break
+            # A request larger than the whole budget waits for an empty window
+            delay = max(delay, timestamp + _WINDOW_SECONDS - now)
+        return max(delay, 0.0)
+
+    def acquire(self, tokens, level=None):
+        """Block until the request may be sent; returns a reservation for reconcile()"""
+        level = current_priority() if level is None else level
+        ticket = (level, next(self._sequence))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        now = time.monotonic()
+                        delay = self._delay_for(tokens, now)
+                        if delay <= 0:
+                            heapq.heappop(self._waiting)
+                            reservation = [tokens]
+                            self._window.append((now, reservation))
+                            self._window_tokens += tokens
+                            self._cond.notify_all()
+                            return reservation
+                        self._cond.wait(delay)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def reconcile(self, reservation, actual_tokens):
+        """Replace a reservation's estimate with the tokens the API reported"""
+        if actual_tokens is None:
+            return
+        with self._cond:
+            self._window_tokens += actual_tokens - reservation[0]
+            reservation[0] = actual_tokens
+            self._cond.notify_all()
+
+    def queue_depth(self):
+        """Number of requests waiting for budget"""
+        with self._cond:
+            return len(self._waiting)
+
+
+def _is_retryable(error):
+    if isinstance(error, (RateLimitError, APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_delay(error, attempt):
+    """Server-requested delay if any, otherwise capped exponential backoff with full jitter"""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), config.RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+def call_with_budget(send, messages, max_tokens):
+    """Send a request once the budget allows, retrying 429s, timeouts and 5xx errors.
+
+    send() performs the API call. Returns (response, reservation) so the caller
+    can reconcile the token estimate with the reported usage.
+    """
+    tokens = estimate_tokens(messages, max_tokens)
+    attempt = 0
+    while True:
+        reservation = request_scheduler.acquire(tokens)
+        try:
+            return send(), reservation
+        except Exception as e:
+            if attempt >= config.MAX_RETRIES or not _is_retryable(e):
+                raise
+            time.sleep(_retry_delay(e, attempt))
+            attempt += 1
+
+
+request_scheduler = RateLimitScheduler(config.REQUESTS_PER_MINUTE, config.TOKENS_PER_MINUTE)
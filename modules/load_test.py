@@ -0,0 +1,461 @@
+"""Simulate concurrent users to find where rerun latency starts to climb.
+
+Starts one real `streamlit run app.py` server pointed at the bundled fake
+OpenAI server (see modules.fake_openai) and drives concurrent sessions
+against it over the same websocket the browser uses:
+
+    python -m modules.load_test --users 1,5,10,20 --latency 0.8 --output load.json
+
+Each simulated user opens a fresh session, fills in the intake form,
+answers every intake chat question (see modules.intake.INTAKE_QUESTIONS),
+then visits Voting Rights and Form Preview. All sessions share the one
+server process, so its script threads, worker pool, rate budget, caches and
+GIL are what is measured. Every concurrency level gets a freshly started
+server, so levels do not inherit each other's warm caches.
+
+For every concurrency level the report gives throughput in script runs per
+second, p50/p95/p99 run latency overall and per step, errors, and the peak
+thread count and resident memory of the server process. Errors count
+failed steps in the app and failures of the harness itself, such as a
+session that could not connect or never finished.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from modules.benchmark import APP_PATH
+from modules.fake_openai import start_server
+
+# Script runs that end the interaction; FINISHED_EARLY_FOR_RERUN is followed by another run
+_FINISHED_STATUSES = {"FINISHED_SUCCESSFULLY", "FINISHED_WITH_COMPILE_ERROR", "FINISHED_FRAGMENT_RUN_SUCCESSFULLY"}
+
+
+def _process_stats(pid):
+    """(threads, resident KiB) of a process, or None where /proc is unavailable"""
+    threads = rss_kib = None
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("Threads:"):
+                    threads = int(line.split()[1])
+                elif line.startswith("VmRSS:"):
+                    rss_kib = int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return threads, rss_kib
+
+
+class ResourceSampler:
+    """Record the peak thread count and resident memory of a process on a background thread"""
+
+    def __init__(self, pid=None, interval=0.2):
+        self.pid = pid
+        self.interval = interval
+        self.peak_threads = None
+        self.peak_rss_kib = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="load-sampler", daemon=True)
+
+    def _run(self):
+        while self.pid is not None and not self._stop.is_set():
+            stats = _process_stats(self.pid)
+            if stats is not None:
+                threads, rss_kib = stats
+                self.peak_threads = max(self.peak_threads or 0, threads or 0)
+                self.peak_rss_kib = max(self.peak_rss_kib or 0, rss_kib or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class AppServer:
+    """A `streamlit run app.py` subprocess on a free local port"""
+
+    def __init__(self, env, startup_timeout=60):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "streamlit", "run", APP_PATH,
+                "--server.headless", "true",
+                "--server.address", "127.0.0.1",
+                "--server.port", str(self.port),
+                "--server.fileWatcherType", "none",
+                "--browser.gatherUsageStats", "false",
+            ],
+            env=env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT,
+        )
+        try:
+            self._wait_until_healthy(startup_timeout)
+        except Exception:
+            self.stop()
+            raise
+
+    def _wait_until_healthy(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"app server exited with code {self.process.returncode}: {self.log_tail()}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise RuntimeError(f"app server did not become healthy within {timeout}s: {self.log_tail()}")
+
+    def log_tail(self, limit=2000):
+        self._log.seek(0)
+        return self._log.read().decode("utf-8", "replace")[-limit:]
+
+    def stop(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self._log.close()
+
+
+class BrowserSession:
+    """One app session driven over the websocket, sending what the browser would.
+
+    Widget values set with set_value() are sent with every later run, like
+    the frontend's widget state; click() and submit() are one-shot triggers.
+    """
+
+    def __init__(self, websocket, timeout):
+        self._websocket = websocket
+        self.timeout = timeout
+        # Widget id -> (element type, element proto, fragment id), most recently drawn last
+        self._widgets = {}
+        self._values = {}
+
+    def find(self, element_type, key=None, label=None):
+        """The most recently drawn widget of this type with the given key or label"""
+        for widget_id, (kind, proto, fragment_id) in reversed(list(self._widgets.items())):
+            if kind != element_type:
+                continue
+            if key is not None and not widget_id.endswith(f"-{key}"):
+                continue
+            if label is not None and proto.label != label:
+                continue
+            return widget_id, proto, fragment_id
+        raise LookupError(f"no {element_type} widget with key={key!r} label={label!r} on the page")
+
+    def set_value(self, widget_id, value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self._values[widget_id] = WidgetState(id=widget_id, string_value=value)
+
+    def run(self, triggers=(), fragment_id=""):
+        """Rerun the script with the current widget values plus any triggers; returns the exceptions it showed"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.fragment_id = fragment_id
+        message.rerun_script.widget_states.widgets.extend(list(self._values.values()) + list(triggers))
+        self._websocket.send(message.SerializeToString())
+
+        exceptions = []
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"script run did not finish within {self.timeout}s")
+            forward = ForwardMsg()
+            forward.ParseFromString(self._websocket.recv(timeout=remaining))
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                proto = getattr(element, element_type)
+                if element_type == "exception":
+                    exceptions.append(proto.message)
+                elif getattr(proto, "id", ""):
+                    self._widgets.pop(proto.id, None)
+                    self._widgets[proto.id] = (element_type, proto, forward.delta.fragment_id)
+            elif kind == "script_finished":
+                if ForwardMsg.ScriptFinishedStatus.Name(forward.script_finished) in _FINISHED_STATUSES:
+                    return exceptions
+
+    def choose(self, element_type, value, key=None, label=None):
+        """Set the value of a text input, selectbox or radio for the next run"""
+        widget_id, _, _ = self.find(element_type, key=key, label=label)
+        self.set_value(widget_id, value)
+
+    def click(self, key):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id, _, fragment_id = self.find("button", key=key)
+        return self.run([WidgetState(id=widget_id, trigger_value=True)], fragment_id=fragment_id)
+
+    def submit(self, key, text):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        widget_id, _, fragment_id = self.find("chat_input", key=key)
+        state = WidgetState(id=widget_id)
+        state.chat_input_value.data = text
+        return self.run([state], fragment_id=fragment_id)
+
+
+def _answers_for(user_id):
+    """Vary answers between users so their prompts are not all identical"""
+    from modules.intake import INTAKE_QUESTIONS
+
+    answers = {}
+    for question in INTAKE_QUESTIONS:
+        if "options" in question:
+            answers[question["id"]] = question["options"][user_id % len(question["options"])]
+        else:
+            answers[question["id"]] = f"Load Test User {user_id}"
+    return answers
+
+
+# Labels of the summary form at the top of the intake page; it rewrites the
+# intake answers on every rerun, so a user has to fill it in as well
+_FORM_FIELDS = {
+    "What is your current legal name?": ("text_input", "current_name"),
+    "What name would you like to change to?": ("text_input", "new_name"),
+    "What is your reason for changing your name?": ("selectbox", "reason"),
+    "Which state do you live in?": ("selectbox", "state"),
+}
+
+
+def _fill_form(session, answers):
+    for label, (element_type, answer_id) in _FORM_FIELDS.items():
+        session.choose(element_type, answers[answer_id], label=label)
+    return session.run()
+
+
+def _step(session, question, answer):
+    """Answer one intake chat question the way the page expects"""
+    if question["type"] in ("select", "radio"):
+        element_type = "selectbox" if question["type"] == "select" else "radio"
+        session.choose(element_type, answer, key=f"temp_{question['id']}")
+        return session.click(f"submit_{question['id']}")
+    prefix = "chat_input" if question["type"] == "text" else "chat_textarea"
+    return session.submit(f"{prefix}_{question['id']}", answer)
+
+
+def _visit(session, page):
+    session.choose("radio", page, label="Choose a Module")
+    return session.run()
+
+
+def simulate_user(url, user_id, think_time=0.0, timeout=120):
+    """Walk one session through the intake chat and two downstream pages, timing each script run"""
+    from websockets.sync.client import connect
+
+    from modules.intake import INTAKE_QUESTIONS
+
+    answers = _answers_for(user_id)
+    results = []
+
+    def timed(step, action, *args):
+        started = time.perf_counter()
+        error = None
+        try:
+            exceptions = action(*args)
+            if exceptions:
+                error = exceptions[0]
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append({"step": step, "latency_ms": (time.perf_counter() - started) * 1000, "error": error})
+        if think_time:
+            time.sleep(think_time)
+        return error is None
+
+    stream_url = url.replace("http://", "ws://", 1) + "/_stcore/stream"
+    with connect(stream_url, subprotocols=["streamlit"], max_size=None, open_timeout=timeout) as websocket:
+        session = BrowserSession(websocket, timeout)
+        if not timed("open", session.run):
+            return results
+        if not timed("intake:form", _fill_form, session, answers):
+            return results
+
+        for question in INTAKE_QUESTIONS:
+            condition = question.get("conditional")
+            if condition and answers.get(condition["id"]) != condition["value"]:
+                continue
+            if not timed(f"intake:{question['id']}", _step, session, question, answers[question["id"]]):
+                return results
+
+        for page in ("Voting Rights", "Form Preview"):
+            if not timed(page, _visit, session, page):
+                return results
+    return results
+
+
+def run_level(url, users, ramp_up=0.0, think_time=0.0, timeout=600, pid=None):
+    """Run `users` concurrent sessions against the app server at url and summarize their script runs.
+
+    Sessions are driven from threads of this process; with pid, the peak
+    threads and memory of the server process are sampled as well.
+    """
+    go = threading.Event()
+    outcomes = {}
+
+    def user(user_id, delay):
+        go.wait()
+        time.sleep(delay)
+        try:
+            outcomes[user_id] = (simulate_user(url, user_id, think_time=think_time), None)
+        except Exception as e:
+            outcomes[user_id] = ([], f"{type(e).__name__}: {e}")
+
+    threads = [
+        threading.Thread(
+            target=user,
+            args=(i, ramp_up * i / (users - 1) if users > 1 else 0.0),
+            name=f"load-user-{i}",
+            daemon=True,
+        )
+        for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+
+    with ResourceSampler(pid) as sampler:
+        started = time.perf_counter()
+        go.set()
+        deadline = time.monotonic() + timeout
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        elapsed = time.perf_counter() - started
+
+    harness_errors = []
+    per_user = []
+    for user_id in range(users):
+        steps, error = outcomes.get(user_id, ([], None))
+        if user_id not in outcomes:
+            harness_errors.append(f"user {user_id}: did not finish within {timeout}s")
+        elif error:
+            harness_errors.append(f"user {user_id}: {error}")
+        per_user.append(steps)
+
+    from modules.llm_gateway import percentile
+
+    runs = [r for steps in per_user for r in steps]
+    ok = [r["latency_ms"] for r in runs if r["error"] is None]
+    steps = {}
+    for r in runs:
+        if r["error"] is None:
+            steps.setdefault(r["step"], []).append(r["latency_ms"])
+    errors = [str(r["error"]) for r in runs if r["error"] is not None] + harness_errors
+    return {
+        "users": users,
+        "elapsed_s": round(elapsed, 2),
+        "script_runs": len(runs),
+        "throughput_runs_per_s": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "completed_users": sum(
+            1 for user_steps in per_user
+            if user_steps and user_steps[-1]["step"] == "Form Preview" and user_steps[-1]["error"] is None
+        ),
+        "latency_ms": {
+            "p50": round(percentile(ok, 50), 1) if ok else None,
+            "p95": round(percentile(ok, 95), 1) if ok else None,
+            "p99": round(percentile(ok, 99), 1) if ok else None,
+        },
+        "step_p95_ms": {step: round(percentile(values, 95), 1) for step, values in steps.items()},
+        "errors": len(errors),
+        "harness_errors": len(harness_errors),
+        "sample_errors": sorted({error[:200] for error in errors})[:5],
+        "server_peak_threads": sampler.peak_threads,
+        "server_peak_rss_kib": sampler.peak_rss_kib,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the app with concurrent simulated users against a fake OpenAI backend.")
+    parser.add_argument("--users", default="1,5,10", help="Comma-separated concurrency levels to run in turn")
+    parser.add_argument("--ramp-up", type=float, default=1.0, help="Seconds over which each level's users start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds a user pauses between steps")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--latency", type=float, default=0.8, help="Median first-token latency of the fake server")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Generation speed of the fake server")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of fake requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fake server latency and faults")
+    args = parser.parse_args(argv)
+
+    try:
+        levels = [int(level) for level in args.users.split(",") if level.strip()]
+    except ValueError:
+        parser.error("--users must be a comma-separated list of integers")
+
+    server_options = {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "rate_limit_rate": args.rate_limit_rate,
+        "seed": args.seed,
+    }
+    server = start_server(**server_options)
+    # The app server reads these at startup; this process never calls the model
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "fake"
+    os.environ["LLM_DISK_CACHE_PATH"] = ""
+
+    report = {"fake_server": server_options, "levels": []}
+    try:
+        for users in levels:
+            app = AppServer(dict(os.environ))
+            try:
+                before = server.stats()
+                level = run_level(app.url, users, ramp_up=args.ramp_up, think_time=args.think_time, pid=app.process.pid)
+                after = server.stats()
+                if app.process.poll() is not None:
+                    level["errors"] += 1
+                    level["harness_errors"] += 1
+                    level["sample_errors"].append(f"app server exited with code {app.process.returncode}")
+            finally:
+                app.stop()
+            level["llm_calls"] = after["requests"] - before["requests"]
+            report["levels"].append(level)
+            print(
+                f"{users:>4} users  {level['throughput_runs_per_s']:>6.2f} runs/s  "
+                f"p50 {level['latency_ms']['p50']}ms  p95 {level['latency_ms']['p95']}ms  "
+                f"p99 {level['latency_ms']['p99']}ms  errors {level['errors']}  "
+                f"completed {level['completed_users']}/{users}  "
+                f"server threads {level['server_peak_threads']}  "
+                f"server rss {(level['server_peak_rss_kib'] or 0) // 1024}MiB",
+                file=sys.stderr,
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 1 if any(level["errors"] for level in report["levels"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""Opt-in profiler for app.py startup and reruns.
+
+Enable it with APP_PROFILE=1 or by passing --profile to the script:
+
+    streamlit run app.py -- --profile
+
+Every rerun then writes one profile in the collapsed-stack format read by
+flamegraph.pl, speedscope and inferno, e.g.
+
+    rerun;render Voting Rights;import modules.voting_rights 18250
+
+where the number is self time in microseconds. Spans cover the phases
+app.py marks (session init, the CSS block, each page render) and every
+module imported for the first time while the rerun is running.
+
+Settings are read straight from the environment instead of
+modules.llm_gateway.config, because profiling has to start before the
+gateway is imported.
+"""
+import builtins
+import importlib.util
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = os.getenv("APP_PROFILE", "") == "1" or "--profile" in sys.argv[1:]
+PROFILE_DIR = os.getenv("APP_PROFILE_DIR", os.path.join(".cache", "profiles"))
+
+_local = threading.local()
+_original_import = builtins.__import__
+_counter_lock = threading.Lock()
+_counter = 0
+
+
+class RerunProfile:
+    """Nested timing spans for one script run, flattened to collapsed stacks"""
+
+    def __init__(self):
+        self.stack = []
+        # "frame;frame;frame" -> self time in seconds
+        self.self_times = {}
+        self._child_time = []
+        self.started = time.perf_counter()
+        self.push("rerun")
+
+    def push(self, name):
+        self.stack.append((name, time.perf_counter()))
+        self._child_time.append(0.0)
+
+    def pop(self):
+        name, started = self.stack[-1]
+        elapsed = time.perf_counter() - started
+        path = ";".join(frame for frame, _ in self.stack)
+        self.self_times[path] = self.self_times.get(path, 0.0) + elapsed - self._child_time.pop()
+        self.stack.pop()
+        if self._child_time:
+            self._child_time[-1] += elapsed
+
+    def collapsed(self):
+        while self.stack:
+            self.pop()
+        return "".join(
+            f"{path} {int(seconds * 1_000_000)}\n"
+            for path, seconds in self.self_times.items()
+            if seconds > 0
+        )
+
+
+def _profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        return _original_import(name, globals, locals, fromlist, level)
+    try:
+        module_name = importlib.util.resolve_name("." * level + name, (globals or {}).get("__package__")) if level else name
+    except (ImportError, ValueError):
+        module_name = name
+    if module_name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+    profile.push(f"import {module_name}")
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        profile.pop()
+
+
+def start():
+    """Begin profiling this script run; a run cut short by st.rerun() is written out first"""
+    if not ENABLED:
+        return
+    if getattr(_local, "profile", None) is not None:
+        _write(_local.profile, suffix="-interrupted")
+    if builtins.__import__ is not _profiled_import:
+        builtins.__import__ = _profiled_import
+    _local.profile = RerunProfile()
+
+
+def finish():
+    """Write the profile of the current script run"""
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        return
+    _local.profile = None
+    _write(profile)
+
+
+@contextmanager
+def span(name):
+    """Time a block as one frame of the current rerun's profile"""
+    profile = getattr(_local, "profile", None)
+    if profile is None:
+        yield
+        return
+    profile.push(name)
+    try:
+        yield
+    finally:
+        profile.pop()
+
+
+def _write(profile, suffix=""):
+    global _counter
+    with _counter_lock:
+        _counter += 1
+        number = _counter
+    path = os.path.join(PROFILE_DIR, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{number:05d}{suffix}.folded")
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profile.collapsed())
+    except OSError as e:
+        print(f"Could not write profile {path}: {e}", file=sys.stderr)
@@ -0,0 +1,138 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import streamlit as st
+
+from modules import session_memo
+from modules.llm_gateway import BACKGROUND, INTERACTIVE, PREFETCH, config, submit_with_priority
+
+_PREFETCH_KEY = "section_prefetch"
+
+
+def render_markdown(placeholder, content):
+    """Default section renderer: show the generated text as markdown"""
+    placeholder.markdown(content)
+
+
+def render_answer_box(placeholder, content):
+    """Show an answer to a typed question in a light grey box"""
+    placeholder.markdown(f"""
+    <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px; margin-top: 10px;">
+        {content}
+    </div>
+    """, unsafe_allow_html=True)
+
+
+class SectionLoader:
+    """Generate a page's independent sections concurrently.
+
+    Each call to add() starts the section's prompt on the shared worker pool
+    and reserves a placeholder at the current position on the page. wait()
+    then paints every section as soon as its answer arrives, so one slow
+    section never holds back the others. A section that exceeds its timeout
+    is marked as such; its call keeps running and, for cached prompts, the
+    answer is ready on the next rerun.
+
+    Finished sections are memoized in the session against a fingerprint of
+    their arguments, so widget interactions elsewhere on the page repaint
+    them without calling the model again.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = config.SECTION_TIMEOUT if timeout is None else timeout
+        self._sections = []
+
+    def add(self, fn, *args, render=render_markdown, timeout=None, interactive=False):
+        """Start generating fn(*args) and reserve its placeholder here.
+
+        Sections answering a question the user just typed should pass
+        interactive=True so they are scheduled ahead of ordinary section fills.
+        """
+        placeholder = st.empty()
+        name = f"{fn.__module__}.{fn.__qualname__}"
+        inputs_fingerprint = session_memo.fingerprint(*args)
+        content = session_memo.get(name, inputs_fingerprint)
+        if content is not None:
+            render(placeholder, content)
+            return placeholder
+
+        placeholder.caption("Generating...")
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        memo_entry = (name, inputs_fingerprint)
+        future = _take_prefetched(name, inputs_fingerprint)
+        if future is None:
+            level = INTERACTIVE if interactive else BACKGROUND
+            future = submit_with_priority(level, fn, *args)
+        self._sections.append((future, placeholder, render, deadline, memo_entry))
+        return placeholder
+
+    def wait(self):
+        """Block until every section is painted or has timed out"""
+        pending = {future: rest for future, *rest in self._sections}
+        self._sections = []
+
+        while pending:
+            next_deadline = min(deadline for _, _, deadline, _ in pending.values())
+            done, _ = wait(
+                list(pending),
+                timeout=max(0.0, next_deadline - time.monotonic()),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                placeholder, render, _, memo_entry = pending.pop(future)
+                _paint(future, placeholder, render, memo_entry)
+
+            now = time.monotonic()
+            for future, (placeholder, _, deadline, _) in list(pending.items()):
+                if deadline <= now:
+                    del pending[future]
+                    placeholder.warning("This section is taking longer than expected. Refresh the page to try again.")
+
+
+def prefetch(fn, *args):
+    """Start generating fn(*args) for a page the user has not opened yet.
+
+    A later SectionLoader.add() of the same section and arguments picks up
+    the running call instead of starting another one, so the section is
+    usually painted as soon as the page opens. Prefetches only run once the
+    sections of pages users are looking at have started.
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}"
+    inputs_fingerprint = session_memo.fingerprint(*args)
+    if session_memo.get(name, inputs_fingerprint) is not None:
+        return
+    pending = st.session_state.setdefault(_PREFETCH_KEY, {})
+    entry = pending.get(name)
+    if entry is not None and entry[0] == inputs_fingerprint:
+        return
+    pending[name] = (inputs_fingerprint, submit_with_priority(PREFETCH, fn, *args))
+
+
+def _take_prefetched(name, inputs_fingerprint):
+    """Hand over a prefetched call for this section, unless it was for other inputs or already failed"""
+    entry = st.session_state.get(_PREFETCH_KEY, {}).pop(name, None)
+    if entry is None or entry[0] != inputs_fingerprint:
+        return None
+    future = entry[1]
+    # Still queued behind other prefetches; now that the section is on
+    # screen it is resubmitted at its own priority instead
+    if future.cancel():
+        return None
+    if future.done() and (future.exception() is not None or future.result()[1]):
+        return None
+    return future
+
+
+def _paint(future, placeholder, render, memo_entry):
+    try:
+        content, errors = future.result()
+    except Exception as e:
+        placeholder.error(f"Error generating response: {str(e)}")
+        return
+    if errors:
+        placeholder.error(errors[0])
+    elif not content:
+        placeholder.empty()
+    else:
+        session_memo.put(*memo_entry, content)
+        render(placeholder, content)
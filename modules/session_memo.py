@@ -0,0 +1,59 @@
+import hashlib
+import json
+
+import streamlit as st
+
+_MEMO_KEY = "section_memo"
+
+
+def fingerprint(*inputs):
+    """Stable hash of the inputs a generated section depends on"""
+    payload = json.dumps(inputs, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _memo():
+    if _MEMO_KEY not in st.session_state:
+        st.session_state[_MEMO_KEY] = {}
+    return st.session_state[_MEMO_KEY]
+
+
+def get(name, inputs_fingerprint):
+    """Return this session's stored output for name if its inputs are unchanged"""
+    entry = _memo().get(name)
+    if entry is not None and entry[0] == inputs_fingerprint:
+        return entry[1]
+    return None
+
+
+def put(name, inputs_fingerprint, value):
+    """Remember value as the output of name for the given inputs.
+
+    Only the latest inputs are kept per name, so the memo stays as small as
+    the number of sections the session has visited.
+    """
+    _memo()[name] = (inputs_fingerprint, value)
+
+
+def memoize(name, inputs, compute):
+    """Return compute()'s result, recomputing only when inputs change"""
+    inputs_fingerprint = fingerprint(*inputs)
+    value = get(name, inputs_fingerprint)
+    if value is None:
+        value = compute()
+        if value:
+            put(name, inputs_fingerprint, value)
+    return value
+
+
+def memoize_stream(name, inputs, start_stream):
+    """Show the stored answer for inputs, or stream a fresh one and remember it"""
+    inputs_fingerprint = fingerprint(*inputs)
+    value = get(name, inputs_fingerprint)
+    if value is not None:
+        st.write(value)
+        return value
+    value = st.write_stream(start_stream())
+    if value:
+        put(name, inputs_fingerprint, value)
+    return value
@@ -1,39 +1,16 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
 from datetime import datetime, timedelta
+from modules.content_pack import pack_section
+from modules.llm_gateway import BALANCED, ask, get_ai_client
+from modules.section_loader import SectionLoader, render_answer_box
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
-
-def get_ai_response(prompt, client):
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": """You are a task management specialist focusing on name change processes.
+SYSTEM_PROMPT = """You are a task management specialist focusing on name change processes.
                 Provide detailed, actionable steps for completing name changes.
                 Include timing estimates, resource links, and important considerations.
-                Focus on accuracy and completeness while maintaining a supportive tone."""},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating response: {str(e)}")
-        return None
+                Focus on accuracy and completeness while maintaining a supportive tone."""
 
-def get_state_tasks(state, reason, client):
+@pack_section
+def get_state_tasks(state, reason):
     prompt = f"""Create a detailed list of state-specific tasks for a name change in {state} due to {reason}.
     For each task include:
     1. Task name
@@ -42,9 +19,10 @@ def get_state_tasks(state, reason, client):
     4. Required documents
     5. Official resources/URLs
     Focus on court processes and state-specific requirements."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_post_approval_tasks(state, reason, client):
+@pack_section
+def get_post_approval_tasks(state, reason):
     prompt = f"""List all necessary tasks after receiving court approval for a name change in {state} due to {reason}.
     Include:
     1. Government ID updates
@@ -53,9 +31,10 @@ def get_post_approval_tasks(state, reason, client):
     4. Professional updates
     5. Estimated timeline for each
     Order from most to least important."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_timeline_estimate(state, reason, client):
+@pack_section
+def get_timeline_estimate(state, reason):
     prompt = f"""Provide a realistic timeline estimate for completing a name change in {state} due to {reason}.
     Include:
     1. Total estimated time
@@ -63,7 +42,16 @@ def get_timeline_estimate(state, reason, client):
     3. Potential delays to consider
     4. Tips for expediting the process
     5. Important timing considerations"""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+@pack_section
+def get_task_resources(state, reason):
+    prompt = f"Provide 3-4 official resources and tools for managing a name change process in {state}, particularly for {reason}."
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+def get_task_help(state, reason, question):
+    prompt = f"Answer this question about name change tasks in {state} for someone changing their name due to {reason}: {question}"
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
 
 def render_todo_list():
     st.header("Todo List")
@@ -82,14 +70,13 @@ def render_todo_list():
         client = get_ai_client()
         if client and st.button("Generate Checklist"):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant creating checklists for name change processes."},
-                        {"role": "user", "content": f"Create a detailed checklist for changing your name in {state} due to {reason}."}
-                    ]
+                answer = ask(
+                    "You are a helpful assistant creating checklists for name change processes.",
+                    f"Create a detailed checklist for changing your name in {state} due to {reason}.",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("Your Checklist:", response.choices[0].message.content)
+                st.write("Your Checklist:", answer)
             except Exception as e:
                 st.error(f"Error generating checklist: {str(e)}")
 
@@ -98,6 +85,11 @@ def render_todo_list():
     if "todo_items" not in st.session_state:
         st.session_state.todo_items = []
 
+    _render_task_tracker()
+
+@st.fragment
+def _render_task_tracker():
+    """Task list; adding, ticking or deleting a task reruns only this fragment"""
     # Add new task
     new_task = st.text_input("Add a new task:")
     if st.button("Add Task") and new_task:
@@ -114,20 +106,19 @@ def render_todo_list():
                 on_change=lambda i=i: toggle_task(i)
             )
         with col2:
-            if st.button("Delete", key=f"delete_{i}"):
-                st.session_state.todo_items.pop(i)
-                st.rerun()
+            st.button("Delete", key=f"delete_{i}", on_click=delete_task, args=(i,))
 
 def toggle_task(index):
     """Toggle the completion status of a task"""
     st.session_state.todo_items[index]["completed"] = not st.session_state.todo_items[index]["completed"]
 
+def delete_task(index):
+    """Remove a task before the list is redrawn"""
+    st.session_state.todo_items.pop(index)
+
 def render_todo_list_old():
     st.header("Personalized To-Do List")
     
-    # Initialize OpenAI client
-    client = get_ai_client()
-    
     # Get user context from intake form
     user_state = st.session_state.intake_answers.get("state", None)
     user_reason = st.session_state.intake_answers.get("reason", None)
@@ -146,16 +137,11 @@ def render_todo_list_old():
         )
     
     if user_state and user_reason:
+        loader = SectionLoader()
+        
         # Timeline Overview
         st.subheader("Estimated Timeline")
-        timeline = get_timeline_estimate(user_state, user_reason, client)
-        if timeline:
-            st.markdown(f"""
-            <div style="background-color: #f0f7ff; padding: 20px; border-radius: 10px; margin-bottom: 25px;">
-                <h4>Process Timeline</h4>
-                {timeline}
-            </div>
-            """, unsafe_allow_html=True)
+        loader.add(get_timeline_estimate, user_state, user_reason, render=_render_timeline)
         
         # Initialize task completion in session state if not exists
         if "todo_completion" not in st.session_state:
@@ -163,79 +149,72 @@ def render_todo_list_old():
         
         # Court Process Tasks
         st.subheader("📋 Court Process Tasks")
-        court_tasks = get_state_tasks(user_state, user_reason, client)
-        if court_tasks:
-            st.markdown(court_tasks)
-            
-            # Add task tracking
-            st.markdown("### Track Your Progress")
-            task_list = court_tasks.split("\n")
-            for i, task in enumerate(task_list):
-                if task.strip() and task.strip().startswith(("1.", "2.", "3.", "4.", "5.")):
-                    task_id = f"court_{user_state}_{i}"
-                    col1, col2 = st.columns([1, 10])
-                    with col1:
-                        if st.checkbox("", value=st.session_state.todo_completion.get(task_id, False), key=f"check_{task_id}"):
-                            st.session_state.todo_completion[task_id] = True
-                        else:
-                            st.session_state.todo_completion[task_id] = False
-                    with col2:
-                        if st.session_state.todo_completion.get(task_id, False):
-                            st.markdown(f"~~{task.strip()}~~")
-                        else:
-                            st.markdown(task.strip())
+        loader.add(
+            get_state_tasks, user_state, user_reason,
+            render=lambda placeholder, content: _render_tracked_tasks(placeholder, content, f"court_{user_state}")
+        )
         
         # Post-Approval Tasks
         st.subheader("📝 Post-Approval Tasks")
-        post_tasks = get_post_approval_tasks(user_state, user_reason, client)
-        if post_tasks:
-            st.markdown(post_tasks)
-            
-            # Add task tracking
-            st.markdown("### Track Your Progress")
-            task_list = post_tasks.split("\n")
-            for i, task in enumerate(task_list):
-                if task.strip() and task.strip().startswith(("1.", "2.", "3.", "4.", "5.")):
-                    task_id = f"post_{user_state}_{i}"
-                    col1, col2 = st.columns([1, 10])
-                    with col1:
-                        if st.checkbox("", value=st.session_state.todo_completion.get(task_id, False), key=f"check_{task_id}"):
-                            st.session_state.todo_completion[task_id] = True
-                        else:
-                            st.session_state.todo_completion[task_id] = False
-                    with col2:
-                        if st.session_state.todo_completion.get(task_id, False):
-                            st.markdown(f"~~{task.strip()}~~")
-                        else:
-                            st.markdown(task.strip())
+        loader.add(
+            get_post_approval_tasks, user_state, user_reason,
+            render=lambda placeholder, content: _render_tracked_tasks(placeholder, content, f"post_{user_state}")
+        )
         
-        # Progress Tracking
+        # Progress Tracking (filled in once the task lists above have rendered)
         st.subheader("📊 Progress Overview")
-        total_tasks = len([k for k in st.session_state.todo_completion.keys() if k.startswith(("court_", "post_"))])
-        completed_tasks = len([k for k, v in st.session_state.todo_completion.items() if v and k.startswith(("court_", "post_"))])
-        
-        if total_tasks > 0:
-            progress = completed_tasks / total_tasks
-            st.progress(progress)
-            st.markdown(f"**{completed_tasks}** out of **{total_tasks}** tasks completed ({int(progress * 100)}%)")
+        progress_placeholder = st.empty()
         
         # Task Assistance
         st.subheader("Need Help with a Task?")
         task_question = st.text_input("Ask a question about any task:")
         if task_question:
-            help_prompt = f"Answer this question about name change tasks in {user_state} for someone changing their name due to {user_reason}: {task_question}"
-            help_response = get_ai_response(help_prompt, client)
-            if help_response:
-                st.markdown(f"""
-                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px; margin-top: 10px;">
-                    {help_response}
-                </div>
-                """, unsafe_allow_html=True)
+            loader.add(get_task_help, user_state, user_reason, task_question, render=render_answer_box, interactive=True)
         
         # Resources
         st.markdown("---")
         st.subheader("Helpful Resources")
-        resources_prompt = f"Provide 3-4 official resources and tools for managing a name change process in {user_state}, particularly for {user_reason}."
-        resources = get_ai_response(resources_prompt, client)
-        if resources:
-            st.markdown(resources) 
\ No newline at end of file
+        loader.add(get_task_resources, user_state, user_reason)
+        
+        # Every section above is already generating; paint each as it arrives
+        loader.wait()
+        
+        total_tasks = len([k for k in st.session_state.todo_completion.keys() if k.startswith(("court_", "post_"))])
+        completed_tasks = len([k for k, v in st.session_state.todo_completion.items() if v and k.startswith(("court_", "post_"))])
+        
+        if total_tasks > 0:
+            progress = completed_tasks / total_tasks
+            with progress_placeholder.container():
+                st.progress(progress)
+                st.markdown(f"**{completed_tasks}** out of **{total_tasks}** tasks completed ({int(progress * 100)}%)")
+
+def _render_timeline(placeholder, content):
+    placeholder.markdown(f"""
+    <div style="background-color: #f0f7ff; padding: 20px; border-radius: 10px; margin-bottom: 25px;">
+        <h4>Process Timeline</h4>
+        {content}
+    </div>
+    """, unsafe_allow_html=True)
+
+def _render_tracked_tasks(placeholder, tasks, prefix):
+    """Show a generated task list followed by a checkbox for each numbered task"""
+    with placeholder.container():
+        st.markdown(tasks)
+        
+        # Add task tracking
+        st.markdown("### Track Your Progress")
+        task_list = tasks.split("\n")
+        for i, task in enumerate(task_list):
+            if task.strip() and task.strip().startswith(("1.", "2.", "3.", "4.", "5.")):
+                task_id = f"{prefix}_{i}"
+                col1, col2 = st.columns([1, 10])
+                with col1:
+                    if st.checkbox("", value=st.session_state.todo_completion.get(task_id, False), key=f"check_{task_id}"):
+                        st.session_state.todo_completion[task_id] = True
+                    else:
+                        st.session_state.todo_completion[task_id] = False
+                with col2:
+                    if st.session_state.todo_completion.get(task_id, False):
+                        st.markdown(f"~~{task.strip()}~~")
+                    else:
+                        st.markdown(task.strip())
@@ -1,38 +1,15 @@
-import os
-from openai import OpenAI
 import streamlit as st
-from dotenv import load_dotenv
+from modules.content_pack import pack_section
+from modules.llm_gateway import BALANCED, ask, get_ai_client
+from modules.section_loader import SectionLoader, render_answer_box
 
-load_dotenv()
-
-def get_ai_client():
-    """Initialize OpenAI client with API key from environment variables"""
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("OpenAI API key not found. Please set the OPENAI_API_KEY environment variable.")
-        return None
-    return OpenAI(api_key=api_key)
-
-def get_ai_response(prompt, client):
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4-turbo-preview",
-            messages=[
-                {"role": "system", "content": """You are a voting rights specialist focusing on name changes and voter registration.
+SYSTEM_PROMPT = """You are a voting rights specialist focusing on name changes and voter registration.
                 Provide accurate, up-to-date information about voting rights and registration procedures.
                 Focus on practical guidance while emphasizing the importance of verifying with local election offices.
-                Always include appropriate disclaimers about checking official sources."""},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating response: {str(e)}")
-        return None
+                Always include appropriate disclaimers about checking official sources."""
 
-def get_state_voting_info(state, reason, client):
+@pack_section
+def get_state_voting_info(state, reason):
     prompt = f"""Provide detailed information about voter registration requirements in {state}, specifically for someone who has changed their name due to {reason}.
     Include:
     1. Registration deadlines
@@ -41,9 +18,10 @@ def get_state_voting_info(state, reason, client):
     4. Online vs. in-person registration options
     5. ID requirements for voting
     Remember to note this is general information and may vary by county."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_voting_checklist(state, reason, client):
+@pack_section
+def get_voting_checklist(state, reason):
     prompt = f"""Create a detailed checklist for updating voter registration in {state} after a name change due to {reason}.
     Include:
     1. Immediate steps after name change
@@ -52,9 +30,10 @@ def get_voting_checklist(state, reason, client):
     4. Verification steps
     5. What to bring when voting
     Note that requirements may vary by county."""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
 
-def get_voting_faqs(state, reason, client):
+@pack_section
+def get_voting_faqs(state, reason):
     prompt = f"""Generate FAQs about voting rights and registration for someone in {state} who changed their name due to {reason}.
     Address common concerns such as:
     1. Timing of registration updates
@@ -62,7 +41,16 @@ def get_voting_faqs(state, reason, client):
     3. Provisional ballot situations
     4. Special considerations for {reason}
     5. Common challenges and solutions"""
-    return get_ai_response(prompt, client)
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+@pack_section
+def get_voting_resources(state):
+    prompt = f"Provide 3-4 official voting resources (with URLs) for {state}, including the state election office website and voter registration portal."
+    return ask(SYSTEM_PROMPT, prompt, temperature=0.7, cache=True, report_errors=True)
+
+def get_voting_answer(state, reason, question):
+    prompt = f"Answer this specific question about voting rights in {state} for someone who changed their name due to {reason}: {question}"
+    return ask(SYSTEM_PROMPT, prompt, tier=BALANCED, temperature=0.7, report_errors=True)
 
 def render_voting_rights():
     st.header("Voting Rights Information")
@@ -78,14 +66,13 @@ def render_voting_rights():
         client = get_ai_client()
         if client and st.button("Get Voter Registration Information"):
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant providing information about voter registration updates after name changes."},
-                        {"role": "user", "content": f"What are the steps to update voter registration after a name change in {state}?"}
-                    ]
+                answer = ask(
+                    "You are a helpful assistant providing information about voter registration updates after name changes.",
+                    f"What are the steps to update voter registration after a name change in {state}?",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("Registration Information:", response.choices[0].message.content)
+                st.write("Registration Information:", answer)
             except Exception as e:
                 st.error(f"Error getting information: {str(e)}")
 
@@ -95,14 +82,13 @@ def render_voting_rights():
         client = get_ai_client()
         if client:
             try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant providing information about voter registration deadlines."},
-                        {"role": "user", "content": f"What are the voter registration deadlines and requirements in {state}?"}
-                    ]
+                answer = ask(
+                    "You are a helpful assistant providing information about voter registration deadlines.",
+                    f"What are the voter registration deadlines and requirements in {state}?",
+                    tier=BALANCED,
+                    client=client
                 )
-                st.write("Deadlines:", response.choices[0].message.content)
+                st.write("Deadlines:", answer)
             except Exception as e:
                 st.error(f"Error getting deadlines: {str(e)}")
 
@@ -145,37 +131,26 @@ def render_voting_rights():
             ["Marriage", "Divorce", "Gender Identity", "Personal Choice"]
         )
     
+    loader = SectionLoader()
+    
     if user_state and user_reason:
         # State-specific voting information
         st.subheader(f"Voting Rights in {user_state}")
-        voting_info = get_state_voting_info(user_state, user_reason, client)
-        if voting_info:
-            st.markdown(voting_info)
+        loader.add(get_state_voting_info, user_state, user_reason)
         
         # Personalized checklist
         st.subheader("Your Voter Registration Checklist")
-        checklist = get_voting_checklist(user_state, user_reason, client)
-        if checklist:
-            st.markdown(checklist)
+        loader.add(get_voting_checklist, user_state, user_reason)
         
         # FAQs
         st.subheader("Frequently Asked Questions")
-        faqs = get_voting_faqs(user_state, user_reason, client)
-        if faqs:
-            st.markdown(faqs)
+        loader.add(get_voting_faqs, user_state, user_reason)
         
         # Interactive guidance
         st.subheader("Need Specific Guidance?")
         user_question = st.text_input("Ask a question about voting rights and registration:")
         if user_question:
-            prompt = f"Answer this specific question about voting rights in {user_state} for someone who changed their name due to {reason}: {user_question}"
-            answer = get_ai_response(prompt, client)
-            if answer:
-                st.markdown(f"""
-                <div style="background-color: #f8f9fa; padding: 20px; border-radius: 10px; margin-top: 10px;">
-                    {answer}
-                </div>
-                """, unsafe_allow_html=True)
+            loader.add(get_voting_answer, user_state, user_reason, user_question, render=render_answer_box, interactive=True)
     
     # Resources and verification
     st.markdown("---")
@@ -183,10 +158,7 @@ def render_voting_rights():
     
     if user_state:
         # Generate state-specific resources
-        resources_prompt = f"Provide 3-4 official voting resources (with URLs) for {user_state}, including the state election office website and voter registration portal."
-        resources = get_ai_response(resources_prompt, client)
-        if resources:
-            st.markdown(resources)
+        loader.add(get_voting_resources, user_state)
     
     # Registration status check
     st.subheader("Check Your Registration Status")
@@ -210,4 +182,7 @@ def render_voting_rights():
         <p>Update your voter registration immediately after your legal name change to ensure you can vote in the next election.</p>
         <p style="font-size: 0.9em; color: #666;">Always verify information with your local election office for the most current requirements.</p>
     </div>
-    """, unsafe_allow_html=True) 
\ No newline at end of file
+    """, unsafe_allow_html=True) 
+    
+    # Every generated section above is already in flight; paint each as it arrives
+    loader.wait()
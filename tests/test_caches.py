@@ -0,0 +1,101 @@
+import sqlite3
+import time
+
+from modules.llm_gateway import config
+from modules.llm_gateway.cache import ResponseCache, make_cache_key
+from modules.llm_gateway.disk_cache import DiskCache
+
+MESSAGES = [{"role": "user", "content": "hello"}]
+
+
+def _rows(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT key, version FROM responses").fetchall())
+
+
+def test_response_cache_evicts_the_least_recently_used_entry():
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert len(cache) == 2
+
+
+def test_response_cache_entries_expire():
+    cache = ResponseCache(max_entries=10, ttl_seconds=0.05)
+    cache.set("a", "A")
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_response_cache_disabled_with_no_entries():
+    cache = ResponseCache(max_entries=0, ttl_seconds=60)
+    cache.set("a", "A")
+    assert cache.get("a") is None
+
+
+def test_cache_key_changes_with_the_template_version(monkeypatch):
+    key = make_cache_key("gpt-3.5-turbo", MESSAGES, 0.7, 300)
+    assert make_cache_key("gpt-3.5-turbo", MESSAGES, 0.7, 300) == key
+    assert make_cache_key("gpt-4o", MESSAGES, 0.7, 300) != key
+
+    monkeypatch.setattr(config, "PROMPT_TEMPLATE_VERSION", "2")
+    assert make_cache_key("gpt-3.5-turbo", MESSAGES, 0.7, 300) != key
+
+
+def test_disk_cache_round_trip(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_entries=10, ttl_seconds=60, version="1")
+    assert cache.get("a") is None
+    cache.set("a", "A")
+    assert cache.get("a") == "A"
+
+
+def test_disk_cache_ignores_and_prunes_rows_from_another_version(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    old = DiskCache(path, max_entries=10, ttl_seconds=60, version="1")
+    old.set("a", "old answer")
+    new = DiskCache(path, max_entries=10, ttl_seconds=60, version="2")
+
+    assert new.get("a") is None
+    new.set("b", "new answer")
+    new.prune()
+    assert _rows(path) == {"b": "2"}
+
+
+def test_disk_cache_expired_rows_are_misses(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, max_entries=10, ttl_seconds=0.05, version="1")
+    cache.set("a", "A")
+    time.sleep(0.1)
+
+    assert cache.get("a") is None
+    assert _rows(path) == {}
+
+
+def test_disk_cache_prune_keeps_the_most_recently_used_rows(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, max_entries=2, ttl_seconds=60, version="1")
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+    with sqlite3.connect(path) as conn:
+        for accessed_at, key in ((3, "a"), (1, "b"), (2, "c")):
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (accessed_at, key))
+
+    cache.prune()
+    assert sorted(_rows(path)) == ["a", "c"]
+
+
+def test_disk_cache_hits_do_not_write_while_the_access_time_is_fresh(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_entries=10, ttl_seconds=60, version="1")
+    cache.set("a", "A")
+    conn = cache._connect()
+    changes = conn.total_changes
+
+    assert cache.get("a") == "A"
+    assert conn.total_changes == changes
@@ -0,0 +1,73 @@
+import threading
+import time
+
+from modules.llm_gateway.concurrency import PriorityExecutor, pending_tasks, submit_with_priority
+from modules.llm_gateway.scheduler import BACKGROUND, INTERACTIVE, PREFETCH
+
+
+def test_interactive_tasks_start_before_queued_background_tasks():
+    executor = PriorityExecutor(max_workers=1, thread_name_prefix="test-priority")
+    release = threading.Event()
+    started = []
+    executor.submit(BACKGROUND, release.wait, 5)
+    time.sleep(0.05)
+
+    futures = [executor.submit(BACKGROUND, started.append, f"background {i}") for i in range(3)]
+    futures.append(executor.submit(INTERACTIVE, started.append, "interactive"))
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert started == ["interactive", "background 0", "background 1", "background 2"]
+
+
+def test_prefetches_start_after_queued_background_tasks():
+    executor = PriorityExecutor(max_workers=1, thread_name_prefix="test-prefetch")
+    release = threading.Event()
+    started = []
+    executor.submit(BACKGROUND, release.wait, 5)
+    time.sleep(0.05)
+
+    futures = [executor.submit(PREFETCH, started.append, "prefetch")]
+    futures.append(executor.submit(BACKGROUND, started.append, "section"))
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert started == ["section", "prefetch"]
+
+
+def test_workers_are_reused_and_bounded():
+    executor = PriorityExecutor(max_workers=2, thread_name_prefix="test-bounded")
+    for _ in range(20):
+        executor.submit(BACKGROUND, time.sleep, 0).result(timeout=5)
+    assert len(executor._threads) == 1
+
+    release = threading.Event()
+    futures = [executor.submit(BACKGROUND, release.wait, 5) for _ in range(5)]
+    time.sleep(0.05)
+    assert len(executor._threads) == 2
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+
+
+def test_exceptions_are_set_on_the_future():
+    executor = PriorityExecutor(max_workers=1, thread_name_prefix="test-errors")
+    future = executor.submit(INTERACTIVE, lambda: 1 / 0)
+    assert isinstance(future.exception(timeout=5), ZeroDivisionError)
+
+
+def test_submit_with_priority_returns_result_and_reported_errors():
+    from modules.llm_gateway import report_error
+
+    def work():
+        report_error("partial failure")
+        return "content"
+
+    future = submit_with_priority(INTERACTIVE, work)
+    assert future.result(timeout=5) == ("content", ["partial failure"])
+    deadline = time.monotonic() + 5
+    while pending_tasks() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pending_tasks() == 0
@@ -0,0 +1,118 @@
+from concurrent.futures import Future
+
+import pytest
+
+from modules import conversation_memory
+from modules.conversation_memory import ConversationMemory, count_tokens
+
+# 40 characters are estimated at 11 tokens, plus 4 for the message overhead
+TURN = "x" * 40
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    """Capture summary requests instead of sending them to the worker pool"""
+    submitted = []
+
+    def submit_with_priority(level, fn, summary, turns, max_tokens):
+        future = Future()
+        submitted.append((turns, future))
+        return future
+
+    monkeypatch.setattr(conversation_memory, "submit_with_priority", submit_with_priority)
+    monkeypatch.setattr(conversation_memory, "tiktoken", None)
+    return submitted
+
+
+def _turns(memory, count):
+    for i in range(count):
+        memory.append({"role": "user" if i % 2 == 0 else "assistant", "content": f"{i}{TURN}"[:40]})
+
+
+def test_overflowing_the_window_folds_the_oldest_turns(summaries):
+    memory = ConversationMemory(system_prompt="system", window_tokens=40)
+    _turns(memory, 3)
+
+    assert len(summaries) == 1
+    folded, _ = summaries[0]
+    assert [turn["content"][0] for turn in folded] == ["0", "1"]
+    assert [message["content"][0] for message in memory] == ["2"]
+    # Until the summary is ready the folded turns are still sent
+    assert [message["content"][0] for message in memory.prompt_messages()[1:]] == ["0", "1", "2"]
+
+
+def test_no_second_summary_starts_while_one_is_pending(summaries):
+    memory = ConversationMemory(window_tokens=40)
+    _turns(memory, 6)
+    assert len(summaries) == 1
+
+
+def test_finished_summary_replaces_the_folded_turns(summaries):
+    memory = ConversationMemory(system_prompt="system", window_tokens=40)
+    _turns(memory, 3)
+    summaries[0][1].set_result(("they are moving to Texas", []))
+
+    messages = memory.prompt_messages()
+    assert messages[1] == {"role": "system", "content": "Summary of the conversation so far:\nthey are moving to Texas"}
+    assert [message["content"][0] for message in messages[2:]] == ["2"]
+    assert memory.summary == "they are moving to Texas"
+
+
+@pytest.mark.parametrize("outcome", [(None, ["Error generating response: boom"]), ("", []), RuntimeError("boom")])
+def test_failed_summary_drops_the_folded_turns_and_keeps_the_previous_one(summaries, outcome):
+    memory = ConversationMemory(window_tokens=40)
+    memory.summary = "earlier summary"
+    _turns(memory, 3)
+    future = summaries[0][1]
+    if isinstance(outcome, Exception):
+        future.set_exception(outcome)
+    else:
+        future.set_result(outcome)
+
+    assert memory.prompt_messages()[0]["content"].endswith("earlier summary")
+    assert [message["content"][0] for message in memory.prompt_messages()[1:]] == ["2"]
+    # The next overflow may start a new summary
+    _turns(memory, 3)
+    assert len(summaries) == 2
+
+
+def test_turns_are_dropped_without_summarizing_when_summaries_are_off(summaries):
+    memory = ConversationMemory(window_tokens=40, summarize=False)
+    _turns(memory, 3)
+
+    assert summaries == []
+    assert [message["content"][0] for message in memory.prompt_messages()] == ["2"]
+
+
+def test_character_cap_bounds_the_memory_without_a_token_window(summaries):
+    memory = ConversationMemory(window_tokens=0, max_chars=100)
+    _turns(memory, 10)
+
+    assert summaries == []
+    assert memory.char_count() <= 100
+    assert [message["content"][0] for message in memory] == ["8", "9"]
+
+
+def test_character_cap_trims_turns_awaiting_a_summary_first(summaries):
+    memory = ConversationMemory(window_tokens=40, max_chars=90)
+    _turns(memory, 3)
+
+    assert memory.char_count() <= 90
+    assert [message["content"][0] for message in memory.prompt_messages()] == ["1", "2"]
+
+
+def test_oversized_message_is_truncated_to_half_the_cap(summaries):
+    memory = ConversationMemory(window_tokens=0, max_chars=100)
+    memory.append({"role": "user", "content": "y" * 500})
+
+    assert list(memory) == [{"role": "user", "content": "y" * 50 + " [truncated]"}]
+
+
+def test_token_count_falls_back_to_an_estimate_when_the_encoding_cannot_load(monkeypatch):
+    class OfflineTiktoken:
+        def encoding_for_model(self, model):
+            raise OSError("network unreachable")
+
+    monkeypatch.setattr(conversation_memory, "tiktoken", OfflineTiktoken())
+    monkeypatch.setattr(conversation_memory, "_encodings", {})
+    assert count_tokens(TURN, model="gpt-4o") == 11
@@ -0,0 +1,74 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from modules.llm_gateway import RateLimitScheduler, ask, ask_stream, call_metrics, capture_errors
+
+gateway_module = importlib.import_module("modules.llm_gateway.gateway")
+scheduler_module = importlib.import_module("modules.llm_gateway.scheduler")
+
+
+class _FailingCompletions:
+    def create(self, **params):
+        raise ValueError("upstream failed")
+
+
+class _FailingClient:
+    class chat:
+        completions = _FailingCompletions()
+
+
+class _StreamingCompletions:
+    def create(self, **params):
+        for text in ("one ", "two ", "three"):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _StreamingClient:
+    class chat:
+        completions = _StreamingCompletions()
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=100000)
+    monkeypatch.setattr(scheduler_module, "request_scheduler", scheduler)
+    monkeypatch.setattr(gateway_module, "request_scheduler", scheduler)
+    return scheduler
+
+
+def test_ask_raises_api_errors_by_default():
+    with pytest.raises(ValueError):
+        ask("system", "prompt", client=_FailingClient())
+
+
+def test_ask_reports_api_errors_and_returns_none_when_asked_to():
+    with capture_errors() as errors:
+        assert ask("system", "prompt", client=_FailingClient(), report_errors=True) is None
+    assert errors == ["Error generating response: upstream failed"]
+
+
+def test_ask_stream_reports_api_errors_and_ends_the_stream_when_asked_to():
+    with capture_errors() as errors:
+        assert list(ask_stream("system", "prompt", client=_FailingClient(), report_errors=True)) == []
+    assert errors == ["Error generating response: upstream failed"]
+
+
+def test_streamed_calls_reconcile_their_token_reservation(scheduler):
+    reply = "".join(ask_stream("s" * 40, "p" * 40, client=_StreamingClient(), max_tokens=1000))
+
+    assert reply == "one two three"
+    # 80 prompt characters are estimated at 20 tokens, plus one per chunk
+    assert scheduler._window_tokens == 20 + 3
+
+
+def test_streamed_calls_count_as_in_flight_until_they_end(scheduler):
+    before = call_metrics.in_flight()
+    stream = ask_stream("system", "prompt", client=_StreamingClient())
+    assert call_metrics.in_flight() == before
+
+    next(stream)
+    assert call_metrics.in_flight() == before + 1
+    stream.close()
+    assert call_metrics.in_flight() == before
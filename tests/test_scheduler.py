@@ -0,0 +1,109 @@
+import importlib
+import threading
+import time
+
+import pytest
+
+from modules.llm_gateway.scheduler import BACKGROUND, INTERACTIVE, RateLimitScheduler
+
+scheduler_module = importlib.import_module("modules.llm_gateway.scheduler")
+
+WINDOW = 0.4
+
+
+@pytest.fixture(autouse=True)
+def short_window(monkeypatch):
+    monkeypatch.setattr(scheduler_module, "_WINDOW_SECONDS", WINDOW)
+
+
+def _acquire_in_thread(scheduler, tokens, level, admitted):
+    def run():
+        scheduler.acquire(tokens, level=level)
+        admitted.append((level, time.monotonic()))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_for_queue(scheduler, depth, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while scheduler.queue_depth() < depth:
+        assert time.monotonic() < deadline, "request never started waiting"
+        time.sleep(0.005)
+
+
+def test_requests_within_budget_are_admitted_immediately():
+    scheduler = RateLimitScheduler(requests_per_minute=3, tokens_per_minute=1000)
+    started = time.monotonic()
+    for _ in range(3):
+        scheduler.acquire(100, level=BACKGROUND)
+    assert time.monotonic() - started < 0.1
+
+
+def test_request_budget_delays_until_the_window_slides():
+    scheduler = RateLimitScheduler(requests_per_minute=2, tokens_per_minute=0)
+    started = time.monotonic()
+    scheduler.acquire(1)
+    scheduler.acquire(1)
+    scheduler.acquire(1)
+    assert time.monotonic() - started >= WINDOW * 0.9
+
+
+def test_interactive_requests_overtake_waiting_background_requests():
+    scheduler = RateLimitScheduler(requests_per_minute=1, tokens_per_minute=0)
+    scheduler.acquire(1, level=BACKGROUND)
+    admitted = []
+
+    background = _acquire_in_thread(scheduler, 1, BACKGROUND, admitted)
+    _wait_for_queue(scheduler, 1)
+    interactive = _acquire_in_thread(scheduler, 1, INTERACTIVE, admitted)
+    _wait_for_queue(scheduler, 2)
+
+    interactive.join(timeout=5)
+    background.join(timeout=5)
+    assert [level for level, _ in admitted] == [INTERACTIVE, BACKGROUND]
+
+
+def test_token_budget_waits_for_enough_tokens_to_expire():
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=100)
+    started = time.monotonic()
+    scheduler.acquire(60)
+    scheduler.acquire(50)
+    assert time.monotonic() - started >= WINDOW * 0.9
+
+
+def test_oversized_request_waits_for_an_empty_window():
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=100)
+    started = time.monotonic()
+    scheduler.acquire(10)
+    scheduler.acquire(500)
+    assert time.monotonic() - started >= WINDOW * 0.9
+
+
+def test_oversized_request_is_admitted_into_an_empty_window():
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=100)
+    started = time.monotonic()
+    scheduler.acquire(500)
+    assert time.monotonic() - started < 0.1
+
+
+def test_reconcile_frees_tokens_that_were_overestimated():
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=100)
+    reservation = scheduler.acquire(90)
+    scheduler.reconcile(reservation, 20)
+    started = time.monotonic()
+    scheduler.acquire(70)
+    assert time.monotonic() - started < 0.1
+
+
+def test_reconcile_wakes_a_request_waiting_for_tokens():
+    scheduler = RateLimitScheduler(requests_per_minute=0, tokens_per_minute=100)
+    reservation = scheduler.acquire(90)
+    admitted = []
+    thread = _acquire_in_thread(scheduler, 50, BACKGROUND, admitted)
+    _wait_for_queue(scheduler, 1)
+    started = time.monotonic()
+    scheduler.reconcile(reservation, 10)
+    thread.join(timeout=5)
+    assert admitted and admitted[0][1] - started < WINDOW / 2
@@ -0,0 +1,87 @@
+import threading
+import time
+
+from modules.llm_gateway.singleflight import SingleFlight
+
+
+def _call_concurrently(flight, key, fn, callers):
+    """Start callers threads on flight.do(key, fn) and return (threads, outcomes)"""
+    outcomes = []
+    lock = threading.Lock()
+
+    def run():
+        try:
+            result = ("result", flight.do(key, fn))
+        except Exception as e:
+            result = ("error", e)
+        with lock:
+            outcomes.append(result)
+
+    threads = [threading.Thread(target=run) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def _wait_for_followers():
+    """Give every caller time to join the in-flight call"""
+    time.sleep(0.1)
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def fn():
+        executions.append(1)
+        release.wait(5)
+        return "reply"
+
+    threads, outcomes = _call_concurrently(flight, "key", fn, callers=5)
+    _wait_for_followers()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(executions) == 1
+    assert outcomes == [("result", "reply")] * 5
+    assert flight.in_flight() == 0
+
+
+def test_waiting_callers_all_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError("upstream failed")
+
+    def fn():
+        release.wait(5)
+        raise error
+
+    threads, outcomes = _call_concurrently(flight, "key", fn, callers=4)
+    _wait_for_followers()
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(outcomes) == 4
+    assert all(kind == "error" and raised is error for kind, raised in outcomes)
+
+
+def test_key_runs_again_once_the_previous_call_finished():
+    flight = SingleFlight()
+    calls = []
+
+    assert flight.do("key", lambda: calls.append(1) or len(calls)) == 1
+    assert flight.do("key", lambda: calls.append(1) or len(calls)) == 2
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    release = threading.Event()
+    threads, _ = _call_concurrently(flight, "slow", lambda: release.wait(5), callers=1)
+    _wait_for_followers()
+
+    assert flight.do("fast", lambda: "done") == "done"
+    release.set()
+    threads[0].join(timeout=5)